@@ -1,4 +1,11 @@
+import sys
+
 from src.ui.menu import menu_principal
+from src.ui.modo_lote import ejecutar_modo_lote
 
 if __name__ == "__main__":
-    menu_principal()
\ No newline at end of file
+    # python main.py --lote [archivo]  -> procesa comandos sin interfaz (stdin por defecto)
+    if len(sys.argv) > 1 and sys.argv[1] == "--lote":
+        ejecutar_modo_lote(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        menu_principal()
\ No newline at end of file
@@ -0,0 +1,9 @@
+DIAS_SEMANA = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+
+
+def horario_a_minutos(horario):
+    """
+    Convierte un horario "HH:MM" en minutos desde la medianoche.
+    """
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
 
+PLANTILLA_TICKET = (
+    "==== TICKET CINE ====\n"
+    "Numero: {numero}\n"
+    "Funcion: {funcion}\n"
+    "Asiento: {asiento}\n"
+    "Snacks: {snacks}\n"
+    "Total a pagar: ${total:.2f}\n"
+    "\n"
+)
 
 class Entrada(ABC):
     def __init__(self, numero_entrada, funcion, asiento, precio_base):
@@ -14,6 +23,27 @@ class Entrada(ABC):
         self.__precio_base = precio_base
         self._snacks_incluidos = []
 
+    @property
+    def numero_entrada(self):
+        """
+        Propiedad de solo lectura para el número de la entrada.
+        """
+        return self.__numero_entrada
+
+    @property
+    def funcion(self):
+        """
+        Propiedad de solo lectura para la función de la entrada.
+        """
+        return self.__funcion
+
+    @property
+    def asiento(self):
+        """
+        Propiedad de solo lectura para el asiento de la entrada.
+        """
+        return self.__asiento
+
     @property
     def precio_base(self):
         """
@@ -63,17 +93,23 @@ class Entrada(ABC):
         """
         return True
 
+    def renderizar_ticket(self, plantilla=PLANTILLA_TICKET):
+        """
+        Devuelve el texto del ticket a partir de una plantilla, sin imprimirlo.
+        """
+        return plantilla.format(
+            numero=self.__numero_entrada,
+            funcion=self.__funcion,
+            asiento=self.__asiento,
+            snacks=','.join(self._snacks_incluidos) if self._snacks_incluidos else 'Ninguno',
+            total=self.calcular_precio_final(),
+        )
+
     def imprimir_ticket(self):
         """
         Imprime ticket con información completa de la entrada.
         """
-        print("==== TICKET CINE ====")
-        print(f"Numero: {self.__numero_entrada}")
-        print(f"Funcion: {self.__funcion}")
-        print(f"Asiento: {self.__asiento}")
-        print(f"Snacks: {','.join(self._snacks_incluidos) if self._snacks_incluidos else 'Ninguno'}")
-        print(f"Total a pagar: ${self.calcular_precio_final():.2f}")
-        print()
+        print(self.renderizar_ticket(), end="")
 
 
 class EntradaGeneral(Entrada):
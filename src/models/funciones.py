@@ -8,6 +8,7 @@ class Funcion(ABC):
         self.__horario = horario
         self.__sala = sala
         self._asientos_vendidos = 0
+        self._asientos_retenidos = 0
         self.__asientos_disponibles = 100
         self._recaudacion = 0
 
@@ -43,16 +44,62 @@ class Funcion(ABC):
         """
         pass
 
-    def vender_entrada(self, cantidad):
+    def vender_entrada(self, cantidad, importe=None, retenidos=0):
         """
         Vende entradas si hay suficientes asientos disponibles.
+        `importe` permite registrar el precio real cobrado; por defecto usa el precio de la función.
+        `retenidos` indica cuántos de esos asientos ya estaban retenidos por el comprador.
         (Encapsulación, Ocultamiento de datos)
         """
-        if cantidad > self.__asientos_disponibles - self._asientos_vendidos:
+        retenidos = min(retenidos, self._asientos_retenidos)
+        if cantidad > self.asientos_libres() + retenidos:
             print("No hay suficientes asientos disponibles")
             return False
+        self._asientos_retenidos -= retenidos
         self._asientos_vendidos += cantidad
-        self._recaudacion += cantidad * self.calcular_precio_entrada()
+        self._recaudacion += cantidad * self.calcular_precio_entrada() if importe is None else importe
+        return True
+
+    def asientos_libres(self):
+        """
+        Devuelve la cantidad de asientos aún disponibles para la venta
+        (sin contar vendidos ni retenidos).
+        """
+        return self.__asientos_disponibles - self._asientos_vendidos - self._asientos_retenidos
+
+    def retener_asientos(self, cantidad):
+        """
+        Aparta asientos mientras el cliente completa la compra.
+        """
+        if cantidad <= 0 or cantidad > self.asientos_libres():
+            print("No hay suficientes asientos disponibles")
+            return False
+        self._asientos_retenidos += cantidad
+        return True
+
+    def soltar_retencion(self, cantidad):
+        """
+        Devuelve a la venta asientos retenidos (retención liberada o vencida).
+        """
+        if cantidad <= 0 or cantidad > self._asientos_retenidos:
+            print("Cantidad a liberar inválida")
+            return False
+        self._asientos_retenidos -= cantidad
+        return True
+
+    def liberar_asientos(self, cantidad, importe=None):
+        """
+        Devuelve asientos vendidos a la venta (cancelación o reserva vencida)
+        y descuenta su importe de la recaudación; por defecto, el promedio cobrado por asiento.
+        (Encapsulación)
+        """
+        if cantidad <= 0 or cantidad > self._asientos_vendidos:
+            print("Cantidad a liberar inválida")
+            return False
+        if importe is None:
+            importe = self._recaudacion / self._asientos_vendidos * cantidad
+        self._asientos_vendidos -= cantidad
+        self._recaudacion -= importe
         return True
 
     def __calcular_ocupacion_porcentaje(self):
@@ -62,6 +109,13 @@ class Funcion(ABC):
         """
         return (self._asientos_vendidos / self.__asientos_disponibles) * 100
 
+    def obtener_ocupacion(self):
+        """
+        Devuelve el porcentaje de ocupación para reportes.
+        Expone el cálculo privado sin exponer los contadores internos. (Encapsulación)
+        """
+        return self.__calcular_ocupacion_porcentaje()
+
     def get_recaudacion(self):
         """
         Devuelve la recaudación acumulada por la venta de entradas.
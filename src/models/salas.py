@@ -15,6 +15,21 @@ class Sala(ABC):
         self._butacas = [[0 for _ in range(columnas)] for _ in range(filas)]
 
         self._estado_asientos = "Disponible"
+        self._observadores = []
+
+    @property
+    def numero_sala(self):
+        """
+        Propiedad de solo lectura para el número de sala.
+        """
+        return self.__numero_sala
+
+    @property
+    def capacidad(self):
+        """
+        Propiedad de solo lectura para la capacidad de la sala.
+        """
+        return self.__capacidad
 
     @abstractmethod
     def calcular_recargo_sala(self):
@@ -39,22 +54,89 @@ class Sala(ABC):
         """
         return self._butacas[fila][columna] == 0
 
-    def reservar_asiento(self, fila, columna):
+    def suscribir_cambios(self, observador):
+        """
+        Registra una función observador(fila, columna, estado) que se invoca
+        en cada cambio de butaca (0 libre, 1 reservada, 2 retenida).
+        """
+        self._observadores.append(observador)
+
+    def desuscribir_cambios(self, observador):
+        if observador in self._observadores:
+            self._observadores.remove(observador)
+
+    def _notificar(self, fila, columna):
+        """
+        Avisa a los observadores. El cambio de butaca ya está hecho:
+        un observador que falla no debe interrumpir la operación ni a los demás.
+        """
+        estado = self._butacas[fila][columna]
+        for observador in self._observadores:
+            try:
+                observador(fila, columna, estado)
+            except Exception as error:
+                print(f"Error al notificar cambio de butaca: {error}")
+
+    def __en_rango(self, fila, columna):
+        """
+        Verifica que la butaca exista en la matriz de la sala. (Encapsulación)
+        """
+        return 0 <= fila < len(self._butacas) and 0 <= columna < len(self._butacas[0])
+
+    def estado_asiento(self, fila, columna):
+        """
+        Devuelve el estado de una butaca (0 libre, 1 reservada, 2 retenida) o None si no existe.
+        """
+        if not self.__en_rango(fila, columna):
+            return None
+        return self._butacas[fila][columna]
+
+    def reservar_asiento(self, fila, columna, retenido=False):
         """
         Reserva un asiento específico si está disponible y en rango.
+        Con retenido=True confirma un asiento previamente retenido.
         Actualiza estado de la sala. (Encapsulación)
         """
-        if not (0 <= fila < len(self._butacas) and 0 <= columna < len(self._butacas[0])):
+        if not self.__en_rango(fila, columna):
             print("Asiento fuera de rango")
             return False
-        if self.__verificar_disponibilidad(fila, columna):
+        if self.__verificar_disponibilidad(fila, columna) or (retenido and self._butacas[fila][columna] == 2):
             self._butacas[fila][columna] = 1
             self._estado_asientos = "Ocupado"
+            self._notificar(fila, columna)
             return True
         else:
             print("Asiento ya reservado")
             return False
 
+    def retener_asiento(self, fila, columna):
+        """
+        Retiene temporalmente un asiento libre mientras el cliente completa la compra.
+        """
+        if not self.__en_rango(fila, columna):
+            print("Asiento fuera de rango")
+            return False
+        if not self.__verificar_disponibilidad(fila, columna):
+            print("Asiento no disponible")
+            return False
+        self._butacas[fila][columna] = 2
+        self._notificar(fila, columna)
+        return True
+
+    def liberar_asiento(self, fila, columna):
+        """
+        Libera un asiento reservado o retenido (cancelación o retención vencida).
+        """
+        if not self.__en_rango(fila, columna):
+            print("Asiento fuera de rango")
+            return False
+        if self.__verificar_disponibilidad(fila, columna):
+            print("Asiento ya libre")
+            return False
+        self._butacas[fila][columna] = 0
+        self._notificar(fila, columna)
+        return True
+
 
 class Sala2D(Sala):
     """
@@ -0,0 +1,324 @@
+import numpy as np
+
+from src.models.constantes import DIAS_SEMANA
+
+DIMENSIONES = ("funcion", "titulo", "sala", "dia", "hora", "tipo")
+LIMITE_TABLA_DENSA = 1 << 24
+
+
+class DimensionCodificada:
+    """
+    Diccionario de codificación para una dimensión: cada valor distinto
+    se guarda una sola vez y las filas almacenan solo su código entero.
+    """
+    def __init__(self):
+        self.valores = []
+        self._codigos = {}
+
+    def __len__(self):
+        return len(self.valores)
+
+    def codificar(self, valor):
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    def codificar_muchos(self, valores):
+        """
+        Codifica un arreglo de valores usando np.unique para no iterar fila por fila.
+        """
+        unicos, inversos = np.unique(np.asarray(valores), return_inverse=True)
+        mapa = np.array([self.codificar(v.item() if hasattr(v, "item") else v) for v in unicos], dtype=np.int32)
+        return mapa[inversos]
+
+    def buscar(self, valor):
+        return self._codigos.get(valor, -1)
+
+    def decodificar(self, codigo):
+        return self.valores[codigo]
+
+
+class _Columnas:
+    """
+    Conjunto de columnas NumPy que crece por duplicación de capacidad.
+    """
+    def __init__(self, tipos, capacidad=1024):
+        self._tipos = tipos
+        self._datos = {nombre: np.zeros(capacidad, dtype=t) for nombre, t in tipos.items()}
+        self.filas = 0
+
+    def _reservar(self, extra):
+        necesario = self.filas + extra
+        capacidad = len(next(iter(self._datos.values())))
+        if necesario <= capacidad:
+            return
+        while capacidad < necesario:
+            capacidad *= 2
+        for nombre, columna in self._datos.items():
+            nueva = np.zeros(capacidad, dtype=self._tipos[nombre])
+            nueva[:self.filas] = columna[:self.filas]
+            self._datos[nombre] = nueva
+
+    def agregar(self, **columnas):
+        extra = len(next(iter(columnas.values())))
+        self._reservar(extra)
+        for nombre, valores in columnas.items():
+            self._datos[nombre][self.filas:self.filas + extra] = valores
+        self.filas += extra
+
+    def __getitem__(self, nombre):
+        return self._datos[nombre][:self.filas]
+
+
+def _combinar(columnas, tamanos):
+    """
+    Combina columnas de códigos en una sola clave entera (orden mixto-radix).
+    """
+    claves = np.zeros(len(columnas[0]), dtype=np.int64)
+    for columna, tamano in zip(columnas, tamanos):
+        claves *= tamano
+        claves += columna
+    return claves
+
+
+def _agrupar_claves(claves, celdas):
+    """
+    Asigna un grupo compacto a cada clave. Con pocas celdas posibles el grupo es la
+    clave misma (tabla densa); si no, se numeran solo las claves presentes.
+    Devuelve (grupos, cantidad_de_grupos, claves_de_cada_grupo o None si es densa).
+    """
+    if celdas <= LIMITE_TABLA_DENSA:
+        return claves, celdas, None
+    unicas, grupos = np.unique(claves, return_inverse=True)
+    return grupos.ravel(), len(unicas), unicas
+
+
+class AnaliticaVentas:
+    """
+    Almacén columnar del historial de ventas para consultas OLAP.
+    Las dimensiones (función, título, sala, día, hora, tipo de entrada) se guardan
+    codificadas por diccionario y las consultas se resuelven con agregaciones vectorizadas.
+    Las filas se consolidan en un cubo base (una fila por combinación distinta de
+    dimensiones, con cantidad e importe) que se actualiza solo con las filas nuevas:
+    las consultas recorren el cubo en lugar de todo el historial.
+    """
+    def __init__(self):
+        self.dimensiones = {nombre: DimensionCodificada() for nombre in DIMENSIONES}
+        for dia in DIAS_SEMANA:
+            self.dimensiones["dia"].codificar(dia)
+        self._sesiones = DimensionCodificada()        # (función, día) -> código de sesión
+        self._capacidad_sesion = np.zeros(0, dtype=np.float64)
+        tipos = {nombre: np.int32 for nombre in DIMENSIONES}
+        self._entradas = _Columnas({**tipos, "sesion": np.int32, "importe": np.float64})
+        self._confiteria = _Columnas({"funcion": np.int32, "cantidad": np.int32, "importe": np.float64})
+        self._cubo = None
+        self._filas_en_cubo = 0
+
+    # ----------------- Carga ---------------------------
+    def _registrar_capacidades(self, funciones, dias, capacidades):
+        """
+        Codifica las sesiones (función, día) y guarda la capacidad de cada una
+        en una columna propia, indexada por código de sesión.
+        """
+        claves = (np.asarray(funciones, dtype=np.int64) << 32) | np.asarray(dias, dtype=np.int64)
+        sesiones = self._sesiones.codificar_muchos(claves)
+        if len(self._sesiones) > len(self._capacidad_sesion):
+            nueva = np.zeros(max(len(self._sesiones), 2 * len(self._capacidad_sesion)), dtype=np.float64)
+            nueva[:len(self._capacidad_sesion)] = self._capacidad_sesion
+            self._capacidad_sesion = nueva
+        self._capacidad_sesion[sesiones] = capacidades
+        return sesiones
+
+    def registrar_entrada(self, entrada, capacidad_sala=100, dia_semana=None):
+        """
+        Agrega una entrada vendida. El día y la hora se toman de la entrada
+        (EntradaGeneral) o de la función cuando la entrada no los tiene.
+        """
+        funcion = entrada.funcion
+        dia = getattr(entrada, "dia_semana", None) or dia_semana or "lunes"
+        hora = getattr(entrada, "horario_funcion", None)
+        if hora is None:
+            hora = int(funcion.horario.split(":")[0])
+        d = self.dimensiones
+        codigo_funcion = d["funcion"].codificar(funcion.codigo)
+        codigo_dia = d["dia"].codificar(dia.lower())
+        self._entradas.agregar(
+            funcion=[codigo_funcion],
+            titulo=[d["titulo"].codificar(funcion.titulo)],
+            sala=[d["sala"].codificar(funcion.sala)],
+            dia=[codigo_dia],
+            hora=[d["hora"].codificar(hora)],
+            tipo=[d["tipo"].codificar(entrada.__class__.__name__)],
+            sesion=self._registrar_capacidades([codigo_funcion], [codigo_dia], [capacidad_sala]),
+            importe=[entrada.calcular_precio_final()],
+        )
+
+    def cargar_columnas(self, importe, capacidad=100, **dimensiones):
+        """
+        Carga masiva de filas de entradas a partir de arreglos alineados por dimensión
+        (funcion, titulo, sala, dia, hora, tipo). Pensado para historiales de millones de filas.
+        `capacidad` es la capacidad de la sesión (función y día) de cada fila, o una sola para todas.
+        """
+        filas = len(importe)
+        columnas = {}
+        for nombre in DIMENSIONES:
+            valores = dimensiones[nombre]
+            if nombre == "dia":
+                valores = np.char.lower(np.asarray(valores, dtype=str))
+            columnas[nombre] = self.dimensiones[nombre].codificar_muchos(valores)
+        capacidad = np.broadcast_to(np.asarray(capacidad, dtype=np.float64), (filas,))
+        sesiones = self._registrar_capacidades(columnas["funcion"], columnas["dia"], capacidad)
+        self._entradas.agregar(importe=np.asarray(importe, dtype=np.float64), sesion=sesiones, **columnas)
+        # La consolidación se paga en la carga masiva y no en la primera consulta
+        self._cubo_base()
+
+    def cargar_desde_sistema(self, sistema, dia_semana=None):
+        """
+        Importa las entradas vendidas de un SistemaCine.
+        """
+        for entrada in sistema.entradas_vendidas:
+            self.registrar_entrada(entrada, dia_semana=dia_semana)
+
+    def registrar_confiteria(self, codigo_funcion, cantidad, importe):
+        """
+        Agrega una venta de confitería asociada a una función (para la tasa de adjunción).
+        """
+        self._confiteria.agregar(
+            funcion=[self.dimensiones["funcion"].codificar(codigo_funcion)],
+            cantidad=[cantidad],
+            importe=[importe],
+        )
+
+    # ----------------- Cubo base -----------------------
+    def _cubo_base(self):
+        """
+        Devuelve el cubo base, consolidando antes las filas cargadas desde la última consulta.
+        """
+        if self._cubo is not None and self._filas_en_cubo == self._entradas.filas:
+            return self._cubo
+        desde = self._filas_en_cubo
+        nuevas = {nombre: self._entradas[nombre][desde:] for nombre in (*DIMENSIONES, "sesion", "importe")}
+        nuevas["entradas"] = np.ones(len(nuevas["importe"]), dtype=np.int64)
+        if self._cubo is not None:
+            nuevas = {nombre: np.concatenate((self._cubo[nombre], columna)) for nombre, columna in nuevas.items()}
+        tamanos = [max(len(self.dimensiones[n]), 1) for n in DIMENSIONES]
+        columnas = [nuevas[n] for n in DIMENSIONES]
+        if np.prod(tamanos, dtype=np.float64) < 2 ** 62:
+            unicas, grupos = np.unique(_combinar(columnas, tamanos), return_inverse=True)
+            cantidad = len(unicas)
+        else:
+            unicas, grupos = np.unique(np.stack(columnas, axis=1), axis=0, return_inverse=True)
+            cantidad = len(unicas)
+        grupos = grupos.ravel()
+        # Primera fila de cada grupo: aporta los códigos de dimensión y de sesión
+        primeras = np.full(cantidad, len(grupos), dtype=np.int64)
+        np.minimum.at(primeras, grupos, np.arange(len(grupos)))
+        cubo = {nombre: nuevas[nombre][primeras] for nombre in (*DIMENSIONES, "sesion")}
+        cubo["entradas"] = np.bincount(grupos, weights=nuevas["entradas"], minlength=cantidad).astype(np.int64)
+        cubo["importe"] = np.bincount(grupos, weights=nuevas["importe"], minlength=cantidad)
+        self._cubo = cubo
+        self._filas_en_cubo = self._entradas.filas
+        return cubo
+
+    # ----------------- Consultas -----------------------
+    @property
+    def filas(self):
+        return self._entradas.filas
+
+    def _mascara(self, cubo, filtros):
+        """
+        Construye la máscara booleana de las filas del cubo que cumplen los filtros
+        ({dimension: valor} o {dimension: [valores]}). Sin filtros devuelve None.
+        """
+        mascara = None
+        for nombre, valor in (filtros or {}).items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            # Tabla de búsqueda por código: evita comparar cada fila contra cada valor
+            permitidos = np.zeros(len(self.dimensiones[nombre]) + 1, dtype=bool)
+            permitidos[[self.dimensiones[nombre].buscar(v) for v in valores]] = True
+            permitidos[-1] = False
+            condicion = permitidos[cubo[nombre]]
+            mascara = condicion if mascara is None else mascara & condicion
+        return mascara
+
+    def _decodificar(self, claves, por, tamanos):
+        """
+        Convierte claves combinadas en tuplas de valores, una dimensión entera por vez.
+        """
+        indices = np.unravel_index(claves, tamanos)
+        columnas = [np.array(self.dimensiones[n].valores + [None], dtype=object)[i] for n, i in zip(por, indices)]
+        return list(zip(*(c.tolist() for c in columnas)))
+
+    def agrupar(self, por=("titulo",), medida="ingresos", filtros=None):
+        """
+        Agrupa por las dimensiones indicadas y devuelve {tupla_dimensiones: valor}.
+        Medidas: "ingresos", "entradas" u "ocupacion" (porcentaje de butacas vendidas
+        sobre la capacidad de las sesiones distintas en cada celda, por función y día).
+        """
+        if medida not in ("ingresos", "entradas", "ocupacion"):
+            raise ValueError(f"Medida desconocida: {medida}")
+        por = tuple(por)
+        cubo = self._cubo_base()
+        mascara = self._mascara(cubo, filtros)
+        if mascara is not None:
+            cubo = {nombre: columna[mascara] for nombre, columna in cubo.items()}
+        tamanos = tuple(max(len(self.dimensiones[n]), 1) for n in por)
+        claves = _combinar([cubo[n] for n in por], tamanos)
+        grupos, cantidad, unicas = _agrupar_claves(claves, int(np.prod(tamanos, dtype=np.float64)))
+        conteo = np.bincount(grupos, weights=cubo["entradas"], minlength=cantidad)
+        if medida == "ingresos":
+            valores = np.bincount(grupos, weights=cubo["importe"], minlength=cantidad)
+        elif medida == "entradas":
+            valores = conteo
+        else:
+            valores = self._ocupacion(cubo["sesion"], grupos, conteo, cantidad)
+        presentes = np.flatnonzero(conteo)
+        claves_presentes = presentes if unicas is None else unicas[presentes]
+        return dict(zip(self._decodificar(claves_presentes, por, tamanos), valores[presentes].tolist()))
+
+    def _ocupacion(self, sesiones, grupos, conteo, cantidad):
+        """
+        Porcentaje de ocupación por grupo: butacas vendidas sobre la suma de capacidades
+        de las sesiones (función y día) distintas que caen en cada grupo.
+        """
+        pares = np.unique(sesiones.astype(np.int64) * cantidad + grupos)
+        capacidad = np.bincount(pares % cantidad, weights=self._capacidad_sesion[pares // cantidad],
+                                minlength=cantidad)
+        return np.divide(conteo * 100.0, capacidad, out=np.zeros(cantidad), where=capacidad > 0)
+
+    def top_k(self, k, por=("titulo",), medida="ingresos", filtros=None):
+        """
+        Devuelve las k celdas con mayor valor de la medida, ordenadas de mayor a menor.
+        """
+        resultado = self.agrupar(por, medida, filtros)
+        if not resultado:
+            return []
+        claves = list(resultado)
+        valores = np.fromiter(resultado.values(), dtype=np.float64, count=len(claves))
+        k = min(k, len(claves))
+        mejores = np.argpartition(-valores, k - 1)[:k]
+        mejores = mejores[np.argsort(-valores[mejores], kind="stable")]
+        return [(claves[i], float(valores[i])) for i in mejores]
+
+    def mezcla_tipos(self, filtros=None):
+        """
+        Proporción de cada tipo de entrada (EntradaGeneral, EntradaInfantil, ...) sobre el total.
+        """
+        conteo = self.agrupar(("tipo",), "entradas", filtros)
+        total = sum(conteo.values())
+        return {tipo: n / total for (tipo,), n in conteo.items()} if total else {}
+
+    def tasa_adjuncion_confiteria(self):
+        """
+        Ventas de confitería por entrada vendida en cada función.
+        """
+        funciones = max(len(self.dimensiones["funcion"]), 1)
+        cubo = self._cubo_base()
+        entradas = np.bincount(cubo["funcion"], weights=cubo["entradas"], minlength=funciones)
+        confiteria = np.bincount(self._confiteria["funcion"], weights=self._confiteria["cantidad"],
+                                 minlength=funciones)
+        tasas = np.divide(confiteria, entradas, out=np.zeros(funciones), where=entradas > 0)
+        return {self.dimensiones["funcion"].decodificar(i): float(tasas[i])
+                for i in np.flatnonzero(entradas)}
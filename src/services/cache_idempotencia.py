@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _EnCurso:
+    """
+    Operación en ejecución para una clave: los reintentos concurrentes esperan su evento.
+    """
+    __slots__ = ("args", "evento")
+
+    def __init__(self, args):
+        self.args = args
+        self.evento = threading.Event()
+
+
+class CacheIdempotencia:
+    """
+    Cache acotado (LRU + TTL) de resultados por clave de idempotencia.
+    Un reintento con la misma clave devuelve el resultado original en O(1)
+    en lugar de repetir la operación. Reutilizar una clave con otros argumentos
+    se rechaza. La operación se ejecuta fuera del cerrojo del cache: solo esperan
+    los reintentos de la misma clave.
+    """
+    def __init__(self, capacidad=10000, ttl_segundos=300, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._entradas = OrderedDict()   # clave -> (vencimiento, args, resultado)
+        self._en_curso = {}              # clave -> _EnCurso
+        self._cerrojo = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _buscar(self, clave, ahora):
+        item = self._entradas.get(clave)
+        if item is None:
+            return None
+        if item[0] <= ahora:
+            del self._entradas[clave]
+            return None
+        self._entradas.move_to_end(clave)
+        return item
+
+    def _guardar(self, clave, args, resultado, ahora):
+        self._entradas[clave] = (ahora + self.ttl_segundos, args, resultado)
+        self._entradas.move_to_end(clave)
+        # Las entradas más antiguas quedan al frente: se descartan las vencidas o sobrantes
+        while self._entradas:
+            primera = next(iter(self._entradas.values()))
+            if len(self._entradas) <= self.capacidad and primera[0] > ahora:
+                break
+            self._entradas.popitem(last=False)
+
+    @staticmethod
+    def _rechazo():
+        return False, "Clave de idempotencia reutilizada con otros datos"
+
+    def ejecutar(self, clave, operacion, *args):
+        """
+        Ejecuta `operacion(*args)` una sola vez por clave mientras el resultado
+        siga en el cache. Los reintentos concurrentes con la misma clave esperan
+        al primero y reciben su resultado; si los argumentos difieren, se rechazan.
+        """
+        while True:
+            with self._cerrojo:
+                item = self._buscar(clave, self._reloj())
+                if item is not None:
+                    return item[2] if item[1] == args else self._rechazo()
+                en_curso = self._en_curso.get(clave)
+                if en_curso is None:
+                    en_curso = self._en_curso[clave] = _EnCurso(args)
+                    break
+            if en_curso.args != args:
+                return self._rechazo()
+            # Otro hilo ejecuta la misma clave: se espera y se vuelve a consultar el cache
+            en_curso.evento.wait()
+
+        # Si la operación lanza una excepción no se guarda nada:
+        # un reintento en espera la ejecutará de nuevo
+        try:
+            resultado = operacion(*args)
+            with self._cerrojo:
+                self._guardar(clave, args, resultado, self._reloj())
+            return resultado
+        finally:
+            with self._cerrojo:
+                del self._en_curso[clave]
+            en_curso.evento.set()
@@ -0,0 +1,116 @@
+import queue
+import threading
+
+from src.models.entradas import PLANTILLA_TICKET
+
+_FIN = object()
+
+
+class ColaImpresion:
+    """
+    Cola de impresión de tickets en segundo plano.
+    La venta solo encola las entradas; un hilo trabajador las renderiza por lotes
+    desde la plantilla en un buffer y hace una única escritura por lote en el destino
+    (ruta de archivo/dispositivo u objeto con write()).
+    La cola es acotada: si la impresora no da abasto, encolar espera (contrapresión).
+    """
+    def __init__(self, destino, tamano_lote=50, capacidad=1000, plantilla=PLANTILLA_TICKET):
+        self._validar_plantilla(plantilla)
+        if isinstance(destino, str):
+            self._destino = open(destino, "a", encoding="utf-8")
+            self._propio = True
+        else:
+            self._destino = destino
+            self._propio = False
+        self.tamano_lote = tamano_lote
+        self.plantilla = plantilla
+        self.impresos = 0
+        self.errores = 0
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._trabajador = threading.Thread(target=self._procesar, name="cola-impresion", daemon=True)
+        self._trabajador.start()
+
+    @staticmethod
+    def _validar_plantilla(plantilla):
+        """
+        Verifica que la plantilla solo use los campos que provee Entrada.renderizar_ticket.
+        """
+        try:
+            plantilla.format(numero=1, funcion="", asiento="", snacks="", total=0.0)
+        except (KeyError, IndexError, ValueError) as error:
+            raise ValueError(f"Plantilla de ticket inválida: {error!r}") from error
+
+    @property
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def encolar(self, entrada, timeout=None):
+        """
+        Agrega una entrada a la cola. Bloquea si la cola está llena;
+        con `timeout` devuelve False si no hubo lugar a tiempo.
+        Si el trabajador ya no está activo devuelve False en lugar de bloquear.
+        """
+        if not self._trabajador.is_alive():
+            return False
+        try:
+            self._cola.put(entrada, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def encolar_varias(self, entradas, timeout=None):
+        """
+        Intenta encolar todas las entradas y devuelve la lista de las que no entraron.
+        """
+        return [entrada for entrada in entradas if not self.encolar(entrada, timeout)]
+
+    def _procesar(self):
+        while True:
+            lote = [self._cola.get()]
+            # Toma lo que ya esté esperando, hasta completar el lote
+            while len(lote) < self.tamano_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            terminar = _FIN in lote
+            entradas = [e for e in lote if e is not _FIN]
+            if entradas:
+                self._escribir(entradas)
+            for _ in lote:
+                self._cola.task_done()
+            if terminar:
+                return
+
+    def _escribir(self, entradas):
+        try:
+            texto = "".join(e.renderizar_ticket(self.plantilla) for e in entradas)
+            self._destino.write(texto)
+            self._destino.flush()
+            self.impresos += len(entradas)
+        except Exception as error:
+            # Un lote fallido no debe detener al trabajador: la cola quedaría bloqueada
+            self.errores += len(entradas)
+            print(f"Error de impresión: {error}")
+
+    def esperar(self):
+        """
+        Espera a que se impriman todas las entradas encoladas hasta el momento.
+        """
+        self._cola.join()
+
+    def cerrar(self):
+        """
+        Imprime lo pendiente, detiene el trabajador y cierra el destino si lo abrió la cola.
+        """
+        if self._trabajador.is_alive():
+            self._cola.put(_FIN)
+            self._trabajador.join()
+        if self._propio:
+            self._destino.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,201 @@
+import hashlib
+import math
+import threading
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre un bytearray: responde "seguro que no existe"
+    o "probablemente existe" sin guardar los elementos.
+    """
+    def __init__(self, capacidad_esperada=100000, tasa_falsos_positivos=0.001):
+        bits = -capacidad_esperada * math.log(tasa_falsos_positivos) / (math.log(2) ** 2)
+        self._bits = max(8, int(bits))
+        self._hashes = max(1, round(self._bits / capacidad_esperada * math.log(2)))
+        self._datos = bytearray((self._bits + 7) // 8)
+
+    def _posiciones(self, elemento):
+        resumen = hashlib.blake2b(str(elemento).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(resumen[:8], "little")
+        h2 = int.from_bytes(resumen[8:], "little") | 1
+        return [(h1 + i * h2) % self._bits for i in range(self._hashes)]
+
+    def agregar(self, elemento):
+        for pos in self._posiciones(elemento):
+            self._datos[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, elemento):
+        return all(self._datos[pos >> 3] & (1 << (pos & 7)) for pos in self._posiciones(elemento))
+
+
+class _ControlFuncion:
+    """
+    Estado de ingreso de una función: mapa de bits de entradas escaneadas,
+    indexado por el número de orden de cada entrada dentro de la función.
+    """
+    __slots__ = ("escaneadas", "cerrojo", "total", "numeros")
+
+    def __init__(self):
+        self.escaneadas = bytearray()
+        self.cerrojo = threading.Lock()
+        self.total = 0
+        self.numeros = set()
+
+
+class ControlAcceso:
+    """
+    Validación de entradas en la puerta.
+    Índices O(1) por número de entrada y por (función, asiento), un mapa de bits
+    de entradas ya escaneadas por función y un filtro de Bloom que descarta números
+    falsificados sin consultar los índices.
+    Cada función tiene su propio cerrojo de escaneo: los escáneres de distintas
+    funciones no compiten entre sí ni con la venta.
+    """
+    def __init__(self, capacidad_esperada=100000):
+        self._filtro = FiltroBloom(capacidad_esperada)
+        self._por_numero = {}
+        self._por_asiento = {}
+        self._posiciones = {}
+        self._funciones = {}
+        self._cerrojo_registro = threading.Lock()
+
+    def _control(self, codigo_funcion):
+        control = self._funciones.get(codigo_funcion)
+        if control is None:
+            control = self._funciones.setdefault(codigo_funcion, _ControlFuncion())
+        return control
+
+    @staticmethod
+    def _normalizar_numero(numero_entrada):
+        """
+        Acepta números enteros o textos de lectores de código de barras ("000123").
+        Devuelve None si el valor no es un número de entrada.
+        """
+        if isinstance(numero_entrada, bool):
+            return None
+        if isinstance(numero_entrada, int):
+            return numero_entrada
+        if isinstance(numero_entrada, str) and numero_entrada.strip().isdigit():
+            return int(numero_entrada.strip())
+        return None
+
+    def asiento_vendido(self, codigo_funcion, asiento):
+        return asiento is not None and (codigo_funcion, asiento) in self._por_asiento
+
+    def registrar(self, entrada):
+        """
+        Indexa una entrada vendida. Se invoca desde la venta.
+        Rechaza (devuelve False) una segunda entrada para el mismo asiento de la misma función;
+        las entradas sin asiento (admisión general) no se indexan por asiento.
+        """
+        codigo = entrada.funcion.codigo
+        clave_asiento = (codigo, entrada.asiento)
+        with self._cerrojo_registro:
+            if entrada.asiento is not None and clave_asiento in self._por_asiento:
+                print(f"Entrada duplicada: el asiento {entrada.asiento} de {codigo} ya fue vendido")
+                return False
+            control = self._control(codigo)
+            posicion = control.total
+            control.total += 1
+            if posicion >> 3 >= len(control.escaneadas):
+                control.escaneadas.extend(bytearray(max(8, len(control.escaneadas))))
+            self._posiciones[entrada.numero_entrada] = posicion
+            control.numeros.add(entrada.numero_entrada)
+            if entrada.asiento is not None:
+                self._por_asiento[clave_asiento] = entrada
+            self._por_numero[entrada.numero_entrada] = entrada
+            self._filtro.agregar(entrada.numero_entrada)
+            return True
+
+    def retirar_funcion(self, codigo_funcion):
+        """
+        Descarta los índices y el mapa de bits de una función retirada de cartelera:
+        sus entradas pasan a ser inexistentes en la puerta.
+        Devuelve la cantidad de entradas descartadas.
+        """
+        with self._cerrojo_registro:
+            control = self._funciones.pop(codigo_funcion, None)
+            if control is None:
+                return 0
+            for numero in control.numeros:
+                entrada = self._por_numero.pop(numero)
+                self._posiciones.pop(numero)
+                if entrada.asiento is not None:
+                    self._por_asiento.pop((codigo_funcion, entrada.asiento), None)
+            return len(control.numeros)
+
+    def anular(self, codigo_funcion, numeros):
+        """
+        Da de baja entradas canceladas de una función: dejan de ser válidas en la puerta
+        y su asiento vuelve a poder venderse. Todas o ninguna: rechaza números inexistentes,
+        de otra función o ya utilizados.
+        Devuelve (True, entradas) o (False, motivo).
+        """
+        with self._cerrojo_registro:
+            control = self._funciones.get(codigo_funcion)
+            if control is None or len(set(numeros)) != len(numeros):
+                return False, "Entrada inexistente"
+            # Con el cerrojo de escaneo tomado, ninguna entrada puede usarse mientras se anula
+            with control.cerrojo:
+                entradas = []
+                for numero in numeros:
+                    if numero not in control.numeros:
+                        return False, "Entrada inexistente"
+                    posicion = self._posiciones[numero]
+                    if control.escaneadas[posicion >> 3] & (1 << (posicion & 7)):
+                        return False, "Entrada ya utilizada"
+                    entradas.append(self._por_numero[numero])
+                for entrada in entradas:
+                    control.numeros.discard(entrada.numero_entrada)
+                    del self._por_numero[entrada.numero_entrada]
+                    del self._posiciones[entrada.numero_entrada]
+                    if entrada.asiento is not None:
+                        self._por_asiento.pop((codigo_funcion, entrada.asiento), None)
+            return True, entradas
+
+    def buscar(self, numero_entrada=None, codigo_funcion=None, asiento=None):
+        """
+        Busca una entrada por número o por (función, asiento) sin recorrer las ventas.
+        """
+        if numero_entrada is not None:
+            numero_entrada = self._normalizar_numero(numero_entrada)
+            if numero_entrada is None or numero_entrada not in self._filtro:
+                return None
+            return self._por_numero.get(numero_entrada)
+        return self._por_asiento.get((codigo_funcion, asiento))
+
+    def validar(self, numero_entrada=None, codigo_funcion=None, asiento=None, funcion_puerta=None):
+        """
+        Valida una entrada en la puerta y la marca como utilizada.
+        `funcion_puerta` (código) rechaza entradas de otra función.
+        Devuelve (True, entrada) o (False, motivo).
+        """
+        entrada = self.buscar(numero_entrada, codigo_funcion, asiento)
+        if entrada is None:
+            return False, "Entrada inexistente"
+        codigo = entrada.funcion.codigo
+        if funcion_puerta is not None and codigo != funcion_puerta:
+            return False, "La entrada corresponde a otra función"
+        control = self._funciones.get(codigo)
+        if control is None:
+            return False, "Entrada inexistente"
+        with control.cerrojo:
+            # La entrada pudo anularse entre la búsqueda y el escaneo
+            if entrada.numero_entrada not in control.numeros:
+                return False, "Entrada inexistente"
+            posicion = self._posiciones[entrada.numero_entrada]
+            byte, bit = posicion >> 3, 1 << (posicion & 7)
+            if control.escaneadas[byte] & bit:
+                return False, "Entrada ya utilizada"
+            control.escaneadas[byte] |= bit
+        return True, entrada
+
+    def escaneadas(self, codigo_funcion):
+        """
+        Cantidad de entradas ya validadas para una función.
+        """
+        control = self._funciones.get(codigo_funcion)
+        if control is None:
+            return 0
+        with control.cerrojo:
+            return sum(bin(b).count("1") for b in control.escaneadas)
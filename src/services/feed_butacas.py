@@ -0,0 +1,107 @@
+import queue
+import threading
+
+_FIN = object()
+
+
+class FeedButacas:
+    """
+    Flujo de cambios del mapa de butacas de una sala.
+    Cada reserva, retención o liberación produce un delta (version, fila, columna, estado)
+    con versión creciente. Los deltas recientes se guardan en un buffer circular acotado:
+    un suscriptor pide "cambios desde la versión N" y solo recibe la foto completa
+    cuando quedó demasiado atrás.
+    El delta se registra dentro de la operación de butacas; los suscriptores se invocan
+    después, desde un hilo propio del feed, para no demorar ni romper la venta.
+    """
+    def __init__(self, sala, capacidad_buffer=1024):
+        self.sala = sala
+        self.capacidad_buffer = capacidad_buffer
+        self._buffer = [None] * capacidad_buffer
+        self.version = 0
+        self.errores = 0
+        self._suscriptores = []
+        self._cerrojo = threading.Lock()
+        self._despacho = queue.Queue()
+        self._despachador = None
+        self._cerrado = False
+        sala.suscribir_cambios(self._registrar)
+
+    def _registrar(self, fila, columna, estado):
+        with self._cerrojo:
+            self.version += 1
+            delta = (self.version, fila, columna, estado)
+            self._buffer[self.version % self.capacidad_buffer] = delta
+            if self._suscriptores:
+                self._despacho.put(delta)
+
+    def _despachar(self):
+        while True:
+            delta = self._despacho.get()
+            if delta is _FIN:
+                self._despacho.task_done()
+                return
+            with self._cerrojo:
+                suscriptores = list(self._suscriptores)
+            for suscriptor in suscriptores:
+                try:
+                    suscriptor(delta)
+                except Exception as error:
+                    # Un suscriptor que falla no debe cortar el flujo de los demás
+                    self.errores += 1
+                    print(f"Error en suscriptor del feed de butacas: {error}")
+            self._despacho.task_done()
+
+    def suscribir(self, suscriptor):
+        """
+        Registra una función que recibe cada delta, en orden, poco después de producirse.
+        Devuelve la foto actual para que el suscriptor parta de un estado conocido.
+        """
+        with self._cerrojo:
+            if self._despachador is None and not self._cerrado:
+                self._despachador = threading.Thread(target=self._despachar, name="feed-butacas", daemon=True)
+                self._despachador.start()
+            self._suscriptores.append(suscriptor)
+            return self._foto()
+
+    def desuscribir(self, suscriptor):
+        with self._cerrojo:
+            if suscriptor in self._suscriptores:
+                self._suscriptores.remove(suscriptor)
+
+    def cerrar(self):
+        """
+        Deja de escuchar los cambios de la sala, entrega los deltas pendientes,
+        detiene el hilo despachador y descarta a los suscriptores.
+        """
+        self.sala.desuscribir_cambios(self._registrar)
+        with self._cerrojo:
+            self._cerrado = True
+            despachador, self._despachador = self._despachador, None
+        if despachador is not None:
+            self._despacho.put(_FIN)
+            # Un suscriptor que cierra el feed corre en el despachador: no puede esperarse a sí mismo
+            if despachador is not threading.current_thread():
+                despachador.join()
+        with self._cerrojo:
+            self._suscriptores.clear()
+
+    def esperar(self):
+        """
+        Espera a que los suscriptores reciban todos los deltas registrados hasta el momento.
+        """
+        self._despacho.join()
+
+    def _foto(self):
+        return {"version": self.version, "butacas": tuple(tuple(fila) for fila in self.sala._butacas)}
+
+    def cambios_desde(self, version):
+        """
+        Devuelve {"version", "cambios"} con los deltas posteriores a `version`,
+        o {"version", "butacas"} con la foto completa si esos deltas ya salieron del buffer.
+        """
+        with self._cerrojo:
+            if version < self.version - self.capacidad_buffer or version > self.version:
+                return self._foto()
+            cambios = [self._buffer[v % self.capacidad_buffer] for v in range(version + 1, self.version + 1)]
+            return {"version": self.version, "cambios": cambios}
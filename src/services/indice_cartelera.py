@@ -0,0 +1,127 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from src.models.constantes import horario_a_minutos
+
+MAXIMO_CACHE = 1024
+
+
+def _edad_minima(restriccion):
+    """
+    Convierte "Mayores de 15" en 15 y "Todo publico" en 0.
+    """
+    numeros = [int(p) for p in restriccion.split() if p.isdigit()]
+    return numeros[0] if numeros else 0
+
+
+class IndiceCartelera:
+    """
+    Índices sobre las funciones de la cartelera para consultas de kiosco.
+    Mantiene un índice ordenado por horario (búsqueda con bisect) e índices hash por
+    título, sala, formato de proyección y restricción de edad. Las consultas intersectan
+    los conjuntos candidatos en lugar de recorrer toda la cartelera, y sus resultados
+    se guardan en cache hasta que la programación cambia.
+    """
+    def __init__(self, funciones=()):
+        self._funciones = {}
+        self._horarios = []          # lista ordenada de (minutos, codigo)
+        self._indices = {"titulo": {}, "sala": {}, "formato": {}, "edad_minima": {}}
+        self._cache = {}
+        self._cerrojo = threading.Lock()
+        for funcion in funciones:
+            self.agregar(funcion)
+
+    def __len__(self):
+        return len(self._funciones)
+
+    @staticmethod
+    def _claves(funcion):
+        formato = getattr(funcion, "formato_proyeccion", None)
+        return {
+            "titulo": funcion.titulo.lower(),
+            "sala": funcion.sala,
+            "formato": formato and formato.lower(),
+            "edad_minima": _edad_minima(funcion.obtener_restriccion_edad()),
+        }
+
+    def agregar(self, funcion):
+        with self._cerrojo:
+            if funcion.codigo in self._funciones:
+                self._quitar(funcion.codigo)
+            self._funciones[funcion.codigo] = funcion
+            insort(self._horarios, (horario_a_minutos(funcion.horario), funcion.codigo))
+            for nombre, clave in self._claves(funcion).items():
+                if clave is not None:
+                    self._indices[nombre].setdefault(clave, set()).add(funcion.codigo)
+            self._cache.clear()
+
+    def retirar(self, codigo):
+        with self._cerrojo:
+            funcion = self._quitar(codigo)
+            self._cache.clear()
+            return funcion
+
+    def _quitar(self, codigo):
+        funcion = self._funciones.pop(codigo, None)
+        if funcion is None:
+            return None
+        self._horarios.remove((horario_a_minutos(funcion.horario), codigo))
+        for nombre, clave in self._claves(funcion).items():
+            codigos = self._indices[nombre].get(clave)
+            if codigos is not None:
+                codigos.discard(codigo)
+                if not codigos:
+                    del self._indices[nombre][clave]
+        return funcion
+
+    def obtener(self, codigo):
+        return self._funciones.get(codigo)
+
+    def consultar(self, desde=None, hasta=None, titulo=None, sala=None, formato=None, edad=None):
+        """
+        Devuelve las funciones que cumplen todos los criterios, ordenadas por horario.
+        `desde`/`hasta` son horarios "HH:MM" inclusivos y `edad` filtra las funciones
+        aptas para esa edad según obtener_restriccion_edad(). Título y formato
+        no distinguen mayúsculas.
+        """
+        clave_cache = (desde, hasta, titulo and titulo.lower(), sala, formato and formato.lower(), edad)
+        with self._cerrojo:
+            resultado = self._cache.get(clave_cache)
+            if resultado is None:
+                if len(self._cache) >= MAXIMO_CACHE:
+                    self._cache.clear()
+                resultado = self._cache[clave_cache] = self._consultar(*clave_cache)
+            return list(resultado)
+
+    def _consultar(self, desde, hasta, titulo, sala, formato, edad):
+        candidatos = []
+        for nombre, clave in (("titulo", titulo), ("sala", sala), ("formato", formato)):
+            if clave is not None:
+                candidatos.append(self._indices[nombre].get(clave, set()))
+        if edad is not None:
+            aptas = set()
+            for minima, codigos in self._indices["edad_minima"].items():
+                if minima <= edad:
+                    aptas |= codigos
+            candidatos.append(aptas)
+
+        minimo = None if desde is None else horario_a_minutos(desde)
+        maximo = None if hasta is None else horario_a_minutos(hasta)
+        inicio = 0 if minimo is None else bisect_left(self._horarios, (minimo, ""))
+        fin = len(self._horarios) if maximo is None else bisect_right(self._horarios, (maximo, "\uffff"))
+        if not candidatos:
+            return tuple(self._funciones[c] for _, c in self._horarios[inicio:fin])
+
+        # Intersección empezando por el conjunto más chico
+        candidatos.sort(key=len)
+        codigos = set(candidatos[0])
+        for conjunto in candidatos[1:]:
+            codigos &= conjunto
+            if not codigos:
+                return ()
+        if len(codigos) < fin - inicio:
+            # Pocos candidatos: se filtran por horario en lugar de recorrer el rango
+            seleccion = sorted((horario_a_minutos(self._funciones[c].horario), c) for c in codigos)
+            return tuple(self._funciones[c] for m, c in seleccion
+                         if (minimo is None or m >= minimo) and (maximo is None or m <= maximo))
+        return tuple(self._funciones[c] for _, c in self._horarios[inicio:fin] if c in codigos)
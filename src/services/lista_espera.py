@@ -0,0 +1,94 @@
+import heapq
+import itertools
+
+
+class SolicitudEspera:
+    """
+    Pedido de asientos en espera para una función agotada.
+    """
+    __slots__ = ("cliente", "cantidad", "nivel_fidelidad", "orden", "dia_semana", "activa", "entradas")
+
+    def __init__(self, cliente, cantidad, nivel_fidelidad, orden, dia_semana=None):
+        self.cliente = cliente
+        self.cantidad = cantidad
+        self.nivel_fidelidad = nivel_fidelidad
+        self.orden = orden
+        self.dia_semana = dia_semana
+        self.activa = True
+        self.entradas = []
+
+
+class ListaEspera:
+    """
+    Lista de espera de una función, ordenada por nivel de fidelidad (mayor primero)
+    y luego por orden de llegada, sobre un heap binario.
+    Cuando se liberan asientos se asignan automáticamente a las solicitudes
+    en orden de prioridad: cada asignación cuesta O(log n).
+    `vender(solicitud)` emite las entradas de una solicitud y devuelve (ok, entradas);
+    por defecto solo descuenta los asientos de la función.
+    """
+    def __init__(self, funcion, vender=None, al_asignar=None):
+        self.funcion = funcion
+        self._heap = []
+        self._por_cliente = {}
+        self._contador = itertools.count()
+        self._vender = vender or self._vender_asientos
+        self._al_asignar = al_asignar
+
+    def __len__(self):
+        return len(self._por_cliente)
+
+    def _vender_asientos(self, solicitud):
+        return self.funcion.vender_entrada(solicitud.cantidad), []
+
+    def agregar(self, cliente, cantidad, nivel_fidelidad=0, dia_semana=None):
+        """
+        Encola una solicitud. Un cliente solo puede tener una solicitud activa.
+        """
+        if cantidad <= 0:
+            return False, "Cantidad inválida"
+        if cliente in self._por_cliente:
+            return False, "El cliente ya está en la lista de espera"
+        solicitud = SolicitudEspera(cliente, cantidad, nivel_fidelidad, next(self._contador), dia_semana)
+        heapq.heappush(self._heap, (-nivel_fidelidad, solicitud.orden, solicitud))
+        self._por_cliente[cliente] = solicitud
+        return True, solicitud
+
+    def retirar(self, cliente):
+        """
+        Retira la solicitud de un cliente. Se marca inactiva y se descarta
+        del heap de forma perezosa cuando llega a la cima.
+        """
+        solicitud = self._por_cliente.pop(cliente, None)
+        if solicitud is None:
+            return False
+        solicitud.activa = False
+        return True
+
+    def _cima(self):
+        while self._heap and not self._heap[0][2].activa:
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def reasignar(self):
+        """
+        Ofrece los asientos libres de la función a las solicitudes en orden de prioridad.
+        Se detiene cuando la solicitud prioritaria no entra en los asientos libres,
+        para no saltear a quien tiene más prioridad.
+        Devuelve la lista de solicitudes asignadas, con sus entradas.
+        """
+        asignadas = []
+        solicitud = self._cima()
+        while solicitud is not None and solicitud.cantidad <= self.funcion.asientos_libres():
+            ok, entradas = self._vender(solicitud)
+            if not ok:
+                break
+            heapq.heappop(self._heap)
+            del self._por_cliente[solicitud.cliente]
+            solicitud.activa = False
+            solicitud.entradas = entradas
+            asignadas.append(solicitud)
+            if self._al_asignar:
+                self._al_asignar(self.funcion, solicitud)
+            solicitud = self._cima()
+        return asignadas
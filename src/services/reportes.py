@@ -0,0 +1,85 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+# ----------------- Reportes sobre fotos --------------
+# Cada reporte recibe una foto de SistemaCine.tomar_foto() (solo datos, sin objetos vivos),
+# por lo que puede ejecutarse en otro hilo o proceso sin interferir con las ventas.
+
+def reporte_por_funcion(foto):
+    """
+    Vendidos, recaudación y ocupación por función, ordenado por recaudación.
+    """
+    filas = [{"codigo": codigo, **datos} for codigo, datos in foto["funciones"].items()]
+    return sorted(filas, key=lambda f: f["recaudacion"], reverse=True)
+
+
+def reporte_confiteria(foto, umbral_stock_bajo=5):
+    """
+    Stock por producto y lista de productos con stock bajo.
+    """
+    return {
+        "stock": dict(foto["stock"]),
+        "stock_bajo": [codigo for codigo, stock in foto["stock"].items() if stock <= umbral_stock_bajo],
+    }
+
+
+def reporte_ocupacion_salas(foto):
+    """
+    Butacas ocupadas y porcentaje de ocupación de cada sala.
+    """
+    reporte = {}
+    for numero, butacas in foto["butacas"].items():
+        total = sum(len(fila) for fila in butacas)
+        ocupadas = sum(1 for fila in butacas for b in fila if b)
+        reporte[numero] = {
+            "ocupadas": ocupadas,
+            "total": total,
+            "ocupacion": (ocupadas / total) * 100 if total else 0,
+        }
+    return reporte
+
+
+def reporte_completo(foto):
+    """
+    Reúne todos los reportes de una misma foto, con su versión.
+    """
+    return {
+        "version": foto["version"],
+        "ingresos": foto["ingresos"],
+        "total_entradas": foto["total_entradas"],
+        "funciones": reporte_por_funcion(foto),
+        "confiteria": reporte_confiteria(foto),
+        "salas": reporte_ocupacion_salas(foto),
+    }
+
+
+class ReportesEnSegundoPlano:
+    """
+    Ejecuta reportes sobre fotos consistentes en un hilo o proceso aparte.
+    Tomar la foto no bloquea a los vendedores y el cálculo del reporte
+    nunca lee estructuras vivas.
+    """
+    def __init__(self, sistema, modo="hilo", trabajadores=1):
+        if modo not in ("hilo", "proceso"):
+            raise ValueError("modo debe ser 'hilo' o 'proceso'")
+        self.sistema = sistema
+        ejecutor = ThreadPoolExecutor if modo == "hilo" else ProcessPoolExecutor
+        self._ejecutor = ejecutor(max_workers=trabajadores)
+
+    def solicitar(self, reporte=reporte_completo, *args):
+        """
+        Toma una foto ahora y programa el reporte sobre ella.
+        Devuelve un Future con el resultado.
+        En modo proceso, `reporte` debe ser una función de nivel de módulo.
+        """
+        foto = self.sistema.tomar_foto()
+        return self._ejecutor.submit(reporte, foto, *args)
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,151 @@
+import bisect
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class CuboTokens:
+    """
+    Cubo de tokens: se recarga a `tasa` tokens por segundo hasta `capacidad`.
+    Limita el ritmo de admisiones permitiendo ráfagas cortas.
+    """
+    def __init__(self, tasa, capacidad, reloj=time.monotonic):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._reloj = reloj
+        self._tokens = capacidad
+        self._ultima_recarga = reloj()
+
+    def _recargar(self):
+        ahora = self._reloj()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultima_recarga) * self.tasa)
+        self._ultima_recarga = ahora
+
+    def tomar(self):
+        self._recargar()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class SalaEsperaVirtual:
+    """
+    Sala de espera virtual para la salida a la venta de una función muy demandada.
+    Los clientes entran a una cola FIFO; un cubo de tokens admite a los primeros
+    al ritmo sostenible de la función, y cada admitido recibe una ventana de compra
+    limitada. Más allá de `profundidad_maxima` clientes en cola, se rechazan nuevas entradas.
+    """
+    def __init__(self, sistema, funcion, tasa_admision=5, rafaga=10, profundidad_maxima=10000,
+                 ventana_compra_segundos=120, reloj=time.monotonic):
+        self.sistema = sistema
+        self.funcion = funcion
+        self.tasa_admision = tasa_admision
+        self.profundidad_maxima = profundidad_maxima
+        self.ventana_compra_segundos = ventana_compra_segundos
+        self._reloj = reloj
+        self._cubo = CuboTokens(tasa_admision, rafaga, reloj)
+        self._cola = deque()         # (cliente, turno) en orden de llegada
+        self._turnos = {}            # cliente -> turno en la cola
+        self._turnos_emitidos = itertools.count()
+        self._proximo_turno = 0      # turno del primer cliente aún no admitido
+        self._abandonos = []         # turnos (ordenados) de clientes que dejaron la cola sin ser admitidos
+        self._sesiones = {}          # cliente -> vencimiento de la ventana de compra
+        self._comprando = {}         # cliente -> vencimiento, mientras su compra está en curso
+        self._cerrojo = threading.Lock()
+
+    def _admitir(self):
+        """
+        Admite clientes desde el frente de la cola mientras haya tokens.
+        Descarta sesiones vencidas y clientes que abandonaron la cola.
+        """
+        ahora = self._reloj()
+        for cliente in [c for c, vence in self._sesiones.items() if vence <= ahora]:
+            del self._sesiones[cliente]
+        while self._cola:
+            cliente, turno = self._cola[0]
+            # Entrada de un cliente que abandonó (y quizá volvió a entrar con otro turno)
+            if self._turnos.get(cliente) != turno:
+                self._cola.popleft()
+                continue
+            if not self._cubo.tomar():
+                break
+            self._cola.popleft()
+            del self._turnos[cliente]
+            self._proximo_turno = turno + 1
+            self._sesiones[cliente] = ahora + self.ventana_compra_segundos
+        # Los abandonos anteriores al próximo turno ya no afectan ninguna posición
+        del self._abandonos[:bisect.bisect_left(self._abandonos, self._proximo_turno)]
+
+    def _estado(self, cliente):
+        if cliente in self._sesiones:
+            return {"estado": "admitido", "vence_en": self._sesiones[cliente] - self._reloj()}
+        if cliente in self._comprando:
+            return {"estado": "comprando"}
+        turno = self._turnos.get(cliente)
+        if turno is None:
+            return {"estado": "fuera"}
+        # Los clientes que abandonaron delante no cuentan para la posición
+        posicion = turno - self._proximo_turno + 1 - bisect.bisect_left(self._abandonos, turno)
+        return {"estado": "en_cola", "posicion": posicion, "eta_segundos": posicion / self.tasa_admision}
+
+    def entrar(self, cliente):
+        """
+        Ingresa un cliente a la sala de espera.
+        Devuelve (True, estado) o (False, motivo) si la cola está llena.
+        """
+        with self._cerrojo:
+            self._admitir()
+            if cliente not in self._sesiones and cliente not in self._comprando and cliente not in self._turnos:
+                if len(self._turnos) >= self.profundidad_maxima:
+                    return False, "Sala de espera llena, intente más tarde"
+                turno = self._turnos[cliente] = next(self._turnos_emitidos)
+                self._cola.append((cliente, turno))
+                self._admitir()
+            return True, self._estado(cliente)
+
+    def consultar(self, cliente):
+        """
+        Devuelve el estado del cliente: posición y tiempo estimado si está en cola,
+        o el tiempo restante de su ventana de compra si fue admitido.
+        """
+        with self._cerrojo:
+            self._admitir()
+            return self._estado(cliente)
+
+    def abandonar(self, cliente):
+        with self._cerrojo:
+            self._sesiones.pop(cliente, None)
+            self._comprando.pop(cliente, None)
+            turno = self._turnos.pop(cliente, None)
+            if turno is None:
+                return False
+            bisect.insort(self._abandonos, turno)
+            return True
+
+    def comprar(self, cliente, cantidad, clave_idempotencia=None):
+        """
+        Vende asientos de la función solo si el cliente tiene una ventana de compra vigente.
+        La sesión se toma antes de vender, así una misma ventana no habilita dos compras
+        simultáneas. Una compra exitosa cierra la sesión; si falla, la ventana se devuelve
+        mientras siga vigente.
+        """
+        with self._cerrojo:
+            self._admitir()
+            if cliente in self._comprando:
+                return False, "El cliente ya tiene una compra en curso"
+            vence = self._sesiones.pop(cliente, None)
+            if vence is None:
+                return False, "El cliente no tiene una ventana de compra vigente"
+            self._comprando[cliente] = vence
+        try:
+            ok, resultado = self.sistema.vender_asientos_funcion(self.funcion, cantidad,
+                                                                 clave_idempotencia=clave_idempotencia)
+        finally:
+            with self._cerrojo:
+                vence = self._comprando.pop(cliente, None)
+        if not ok and vence is not None and vence > self._reloj():
+            with self._cerrojo:
+                self._sesiones.setdefault(cliente, vence)
+        return ok, resultado
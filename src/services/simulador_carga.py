@@ -0,0 +1,213 @@
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from src.models.constantes import DIAS_SEMANA, horario_a_minutos
+from src.models.funciones import FuncionEstreno
+from src.services.sistema_cine import SistemaCine
+
+# Escenario por defecto: noches de estreno. Todas las claves son opcionales.
+# Cada noche se juega sobre un SistemaCine nuevo y pide a lo sumo `demanda` veces la
+# capacidad real (butacas por función y stock por producto): así las métricas miden
+# ventas aceptadas y no solo el camino rápido de rechazo. Con demanda > 1 se simula sobreventa.
+ESCENARIO_BASE = {
+    "semilla": 42,
+    "operaciones": 5000,        # volumen mínimo: se generan noches hasta alcanzarlo
+    "demanda": 0.95,            # fracción de la capacidad pedida en la noche y función más demandadas
+    "peso_estreno": 6.0,        # cuántas veces más demanda tiene un estreno
+    "prob_grupo": 0.10,         # probabilidad de que una compra sea grupal
+    "tamano_grupo": [4, 12],
+    "ventana_confiteria_min": 30,
+    "dias": {"martes": 3.0},    # peso extra por día (martes con descuento)
+}
+
+
+def cargar_escenario(ruta):
+    """
+    Lee un escenario JSON y lo completa con los valores por defecto.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    return {**ESCENARIO_BASE, **datos}
+
+
+def _asiento(indice):
+    """
+    Butaca número `indice` recorriendo filas de 10: 0 -> "A1", 10 -> "B1".
+    """
+    return f"{chr(65 + indice // 10)}{indice % 10 + 1}"
+
+
+def _generar_noche(escenario, sistema, dia, factor, rnd):
+    """
+    Genera las operaciones de una noche, ordenadas por minuto del día.
+    Cada función recibe pedidos por `factor` de sus butacas, con asientos consecutivos
+    como los asignaría la boletería; cada producto, pedidos por `factor` de su stock.
+    """
+    funciones = sistema.listar_cartelera()
+    pesos = [escenario["peso_estreno"] if isinstance(f, FuncionEstreno) else 1.0 for f in funciones]
+    peso_maximo = max(pesos)
+    grupo_min, grupo_max = escenario["tamano_grupo"]
+    ventana = escenario["ventana_confiteria_min"]
+    inicios = [horario_a_minutos(f.horario) for f in funciones]
+
+    operaciones = []
+    for funcion, peso, inicio in zip(funciones, pesos, inicios):
+        pedidos = round(funcion.asientos_libres() * factor * peso / peso_maximo)
+        vendidos = 0
+        while vendidos < pedidos:
+            cantidad = rnd.randint(grupo_min, grupo_max) if rnd.random() < escenario["prob_grupo"] else 1
+            cantidad = min(cantidad, pedidos - vendidos)
+            asientos = tuple(_asiento(vendidos + i) for i in range(cantidad))
+            vendidos += cantidad
+            # La demanda crece a medida que se acerca la hora de la función
+            minuto = inicio - rnd.expovariate(1 / 45)
+            operaciones.append((minuto, ("entrada", funcion.codigo, asientos, dia, inicio // 60, cantidad)))
+
+    for producto in sistema.listar_menu_confiteria():
+        pedidos = int(producto.stock * factor)
+        while pedidos > 0:
+            cantidad = min(rnd.randint(1, 3), pedidos)
+            pedidos -= cantidad
+            # Ráfaga de confitería en los minutos previos a alguna función
+            minuto = rnd.choices(inicios, weights=pesos)[0] - rnd.uniform(0, ventana)
+            operaciones.append((minuto, ("confiteria", producto.codigo, cantidad)))
+
+    operaciones.sort(key=lambda item: item[0])
+    return [op for _, op in operaciones]
+
+
+def generar_operaciones(escenario):
+    """
+    Genera la secuencia determinista de noches de un escenario: una lista de noches,
+    cada una con sus operaciones. La misma semilla produce siempre la misma secuencia.
+    Cada operación es una tupla ("entrada", codigo_funcion, asientos, dia, hora, cantidad),
+    con un asiento distinto por entrada, o ("confiteria", codigo_producto, cantidad).
+    """
+    escenario = {**ESCENARIO_BASE, **escenario}
+    rnd = random.Random(escenario["semilla"])
+    pesos_dia = [escenario["dias"].get(d, 1.0) for d in DIAS_SEMANA]
+    peso_dia_maximo = max(pesos_dia)
+    sistema = SistemaCine()
+
+    noches, total = [], 0
+    while total < escenario["operaciones"]:
+        dia = rnd.choices(DIAS_SEMANA, weights=pesos_dia)[0]
+        factor = escenario["demanda"] * escenario["dias"].get(dia, 1.0) / peso_dia_maximo
+        noche = _generar_noche(escenario, sistema, dia, factor, rnd)
+        if not noche:
+            break
+        noches.append(noche)
+        total += len(noche)
+    return noches
+
+
+def _ejecutar_operacion(sistema, funciones, op):
+    """
+    Ejecuta una operación contra el sistema y devuelve si fue aceptada.
+    """
+    if op[0] == "confiteria":
+        ok, _ = sistema.vender_producto_confiteria(op[1], op[2])
+        return ok
+    _, codigo, asientos, dia, hora, cantidad = op
+    funcion = funciones[codigo]
+    if cantidad == 1:
+        ok, _ = sistema.vender_entrada_general(funcion, asientos[0], dia, hora)
+    else:
+        ok, _ = sistema.vender_entradas_grupo(funcion, asientos, dia, hora)
+    return ok
+
+
+def _ejecutar_lote(noches):
+    """
+    Ejecuta un lote de noches, cada una sobre un SistemaCine nuevo.
+    Devuelve las latencias (ns) de operaciones aceptadas y rechazadas y los conteos por tipo.
+    """
+    aceptadas, rechazadas = [], []
+    totales = {}
+    rechazos = {}
+    reloj = time.perf_counter_ns
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for operaciones in noches:
+            sistema = SistemaCine()
+            funciones = {f.codigo: f for f in sistema.listar_cartelera()}
+            for op in operaciones:
+                inicio = reloj()
+                ok = _ejecutar_operacion(sistema, funciones, op)
+                (aceptadas if ok else rechazadas).append(reloj() - inicio)
+                tipo = "grupo" if op[0] == "entrada" and op[5] > 1 else op[0]
+                totales[tipo] = totales.get(tipo, 0) + 1
+                if not ok:
+                    rechazos[tipo] = rechazos.get(tipo, 0) + 1
+    return aceptadas, rechazadas, totales, rechazos
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice] / 1e6
+
+
+def _percentiles(latencias):
+    ordenadas = sorted(latencias)
+    return {
+        "cantidad": len(ordenadas),
+        "p50": _percentil(ordenadas, 50),
+        "p90": _percentil(ordenadas, 90),
+        "p99": _percentil(ordenadas, 99),
+        "max": _percentil(ordenadas, 100),
+    }
+
+
+def _armar_reporte(resultados, duracion):
+    aceptadas = [l for res in resultados for l in res[0]]
+    rechazadas = [l for res in resultados for l in res[1]]
+    totales, rechazos = {}, {}
+    for _, _, tot, rech in resultados:
+        for tipo, n in tot.items():
+            totales[tipo] = totales.get(tipo, 0) + n
+        for tipo, n in rech.items():
+            rechazos[tipo] = rechazos.get(tipo, 0) + n
+    operaciones = len(aceptadas) + len(rechazadas)
+    return {
+        "operaciones": operaciones,
+        "duracion_s": duracion,
+        "throughput_ops_s": operaciones / duracion if duracion else 0.0,
+        "throughput_aceptadas_s": len(aceptadas) / duracion if duracion else 0.0,
+        "tasa_rechazo": {tipo: rechazos.get(tipo, 0) / n for tipo, n in totales.items()},
+        # Aceptadas y rechazadas por separado: el rechazo es un camino mucho más corto
+        "latencia_ms": {"aceptadas": _percentiles(aceptadas), "rechazadas": _percentiles(rechazadas)},
+    }
+
+
+def simular(escenario=None, procesos=1):
+    """
+    Reproduce un escenario contra SistemaCine y reporta throughput,
+    tasas de rechazo y percentiles de latencia de operaciones aceptadas y rechazadas.
+    Con procesos > 1 reparte las noches entre un pool de clientes: cada noche corre
+    completa en un solo proceso, con su propio SistemaCine, para que la capacidad de
+    cada función y el stock de cada producto vivan en un solo lugar.
+    """
+    noches = generar_operaciones(escenario or {})
+    if procesos <= 1:
+        inicio = time.perf_counter()
+        resultados = [_ejecutar_lote(noches)]
+        return _armar_reporte(resultados, time.perf_counter() - inicio)
+
+    lotes = [noches[i::procesos] for i in range(procesos)]
+    with Pool(procesos) as pool:
+        inicio = time.perf_counter()
+        resultados = pool.map(_ejecutar_lote, lotes)
+        duracion = time.perf_counter() - inicio
+    return _armar_reporte(resultados, duracion)
+
+
+if __name__ == "__main__":
+    escenario = cargar_escenario(sys.argv[1]) if len(sys.argv) > 1 else dict(ESCENARIO_BASE)
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    print(json.dumps(simular(escenario, procesos), indent=2))
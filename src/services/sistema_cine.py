@@ -1,17 +1,39 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from src.models.constantes import DIAS_SEMANA, horario_a_minutos
 from src.models.funciones import FuncionEstreno, PeliculaClasica, Documental, EventoEspecial
 from src.models.salas import Sala2D, Sala3D, SalaIMAX, SalaVIP
-from src.models.entradas import EntradaGeneral, EntradaInfantil, EntradaEstudiante, ComboPromo
+from src.models.entradas import Entrada, EntradaGeneral, EntradaInfantil, EntradaEstudiante, ComboPromo
 from src.models.confiteria import Palomitas, Bebida, Dulce, Combo
+from src.services.cache_idempotencia import CacheIdempotencia
+from src.services.control_acceso import ControlAcceso
+from src.services.feed_butacas import FeedButacas
+from src.services.indice_cartelera import IndiceCartelera
+from src.services.lista_espera import ListaEspera
 
 class SistemaCine:
     def __init__(self):
         self.salas = self._crear_salas()
         self.cartelera = self._crear_cartelera()
+        self.indice_cartelera = IndiceCartelera(self.cartelera)
         self.menu_confiteria = self._crear_menu_confiteria()
         self.entradas_vendidas = []
+        self._ultima_entrada = 0
         self.ingresos_taquilla = 0
         self.ingresos_confiteria = 0
-
+        self.listas_espera = {}
+        self.feeds_butacas = {}
+        self.control_acceso = ControlAcceso()
+        self._retenciones = {}       # (sala, fila, columna) -> función para la que se retuvo la butaca
+        self._butacas_vendidas = {}  # (sala, fila, columna) -> número de la entrada que la ocupa
+        # Versión tipo seqlock: impar mientras hay una venta en curso.
+        # Los reportes leen sin bloquear y reintentan si la versión cambió.
+        self._version = 0
+        self._cerrojo_escritura = threading.Lock()
+        self._cache_idempotencia = CacheIdempotencia()
 
     def _crear_salas(self):
         return [
@@ -52,6 +74,77 @@ class SistemaCine:
 
         return [pal1, pal2, pal3, beb1, beb2, dul1, dul2, combo1]
 
+# ----------------- Consistencia ----------------------
+    @contextmanager
+    def _mutacion(self):
+        """
+        Serializa las operaciones que modifican el estado y publica una nueva versión.
+        """
+        with self._cerrojo_escritura:
+            self._version += 1
+            try:
+                yield
+            finally:
+                self._version += 1
+
+    def _leer_consistente(self, lector):
+        """
+        Ejecuta `lector` sin tomar el cerrojo de escritura. Si una venta modifica
+        el estado durante la lectura, el resultado se descarta y se repite.
+        """
+        while True:
+            version = self._version
+            if version % 2:
+                time.sleep(0)
+                continue
+            resultado = lector()
+            if self._version == version:
+                return version, resultado
+
+    def _copiar_ingresos(self):
+        return {
+            "taquilla": self.ingresos_taquilla,
+            "confiteria": self.ingresos_confiteria,
+            "total": self.ingresos_taquilla + self.ingresos_confiteria,
+        }
+
+    def _copiar_estado(self):
+        return {
+            "ingresos": self._copiar_ingresos(),
+            "total_entradas": len(self.entradas_vendidas),
+            "funciones": {
+                f.codigo: {
+                    "titulo": f.titulo,
+                    "sala": f.sala,
+                    "horario": f.horario,
+                    "vendidos": f._asientos_vendidos,
+                    "recaudacion": f.get_recaudacion(),
+                    "ocupacion": f.obtener_ocupacion(),
+                }
+                for f in self.cartelera
+            },
+            "stock": {p.codigo: p.stock for p in self.menu_confiteria},
+            "butacas": {s.numero_sala: tuple(tuple(fila) for fila in s._butacas) for s in self.salas},
+        }
+
+    def tomar_foto(self):
+        """
+        Devuelve una copia consistente del estado (versión, ingresos, funciones, stock
+        y butacas) para reportes, sin bloquear las ventas en curso.
+        """
+        version, foto = self._leer_consistente(self._copiar_estado)
+        foto["version"] = version
+        return foto
+
+    def _idempotente(self, clave, operacion, *args):
+        """
+        Sin clave ejecuta la operación. Con clave, un reintento devuelve
+        el resultado original en lugar de repetir la venta.
+        """
+        if clave is None:
+            return operacion(*args)
+        return self._cache_idempotencia.ejecutar((operacion.__name__, clave), operacion, *args)
+
 # ----------------- Negocio ---------------------------
     def listar_cartelera(self):
         return self.cartelera
@@ -59,40 +152,305 @@ class SistemaCine:
     def listar_menu_confiteria(self):
         return self.menu_confiteria
 
-    def reservar_asientos(self, numero_sala, fila, columna):
-        sala = next((s for s in self.salas if s._Sala_numero_sala == numero_sala), None)
+    def buscar_funcion(self, codigo):
+        return self.indice_cartelera.obtener(codigo)
+
+    def buscar_funciones(self, desde=None, hasta=None, titulo=None, sala=None, formato=None, edad=None):
+        """
+        Consulta indexada de la cartelera, p. ej. buscar_funciones(desde="19:00", formato="3D", edad=14).
+        """
+        return self.indice_cartelera.consultar(desde, hasta, titulo, sala, formato, edad)
+
+    def agregar_funcion(self, funcion):
+        with self._mutacion():
+            self.cartelera = [f for f in self.cartelera if f.codigo != funcion.codigo] + [funcion]
+            self.indice_cartelera.agregar(funcion)
+
+    def retirar_funcion(self, codigo):
+        """
+        Quita la función de la cartelera junto con su lista de espera y sus entradas
+        en el control de acceso. El feed de butacas de la sala se cierra si ninguna
+        otra función la usa.
+        """
+        feed = None
+        with self._mutacion():
+            self.cartelera = [f for f in self.cartelera if f.codigo != codigo]
+            funcion = self.indice_cartelera.retirar(codigo)
+            if funcion is None:
+                return None
+            self.listas_espera.pop(codigo, None)
+            self.control_acceso.retirar_funcion(codigo)
+            if all(f.sala != funcion.sala for f in self.cartelera):
+                feed = self.feeds_butacas.pop(funcion.sala, None)
+        # Fuera de la mutación: los suscriptores pendientes pueden volver a operar sobre el sistema
+        if feed is not None:
+            feed.cerrar()
+        return funcion
+
+    def _buscar_sala(self, numero_sala):
+        return next((s for s in self.salas if s.numero_sala == numero_sala), None)
+
+    def reservar_asientos(self, numero_sala, fila, columna, retenido=False, clave_idempotencia=None):
+        return self._idempotente(clave_idempotencia, self._reservar_asientos, numero_sala, fila, columna, retenido)
+
+    def _reservar_asientos(self, numero_sala, fila, columna, retenido):
+        sala = self._buscar_sala(numero_sala)
         if not sala:
             return False, "Sala no encontrada"
-        ok = sala.reservar_asiento(fila, columna)
+        with self._mutacion():
+            ok = sala.reservar_asiento(fila, columna, retenido)
         return ok, "Reserva realizada" if ok else "No se pudo reservar"
 
-    def vender_entrada_general(self, funcion, asiento, dia_semana, hora_int):
-        entrada = EntradaGeneral(
-            numero_entrada=len(self.entradas_vendidas) + 1,
-            funcion=funcion,
-            asiento=asiento,
-            precio_base=100,
-            dia_semana=dia_semana,
-            horario_funcion=hora_int,
-        )
-        if not entrada.validar_requisitos():
-            return False, "Entrada no valida"
-        self.entradas_vendidas.append(entrada)
-        self.ingresos_taquilla += entrada.calcular_precio_final()
-        return True, entrada
-
-    def vender_producto_confiteria(self, codigo, cantidad):
+    def retener_asiento(self, numero_sala, fila, columna, *, funcion=None, clave_idempotencia=None):
+        """
+        Retiene una butaca mientras el cliente completa la compra.
+        Con `funcion`, la retención también aparta un asiento de esa función, y la compra
+        se confirma con vender_entrada_general(..., butaca_retenida=(fila, columna)).
+        """
+        return self._idempotente(clave_idempotencia, self._retener_asiento, numero_sala, fila, columna, funcion)
+
+    def _retener_asiento(self, numero_sala, fila, columna, funcion):
+        sala = self._buscar_sala(numero_sala)
+        if not sala:
+            return False, "Sala no encontrada"
+        with self._mutacion():
+            if funcion is not None and funcion.asientos_libres() < 1:
+                return False, "No se pudo retener"
+            ok = sala.retener_asiento(fila, columna)
+            if ok and funcion is not None:
+                funcion.retener_asientos(1)
+                self._retenciones[(numero_sala, fila, columna)] = funcion
+        return ok, "Asiento retenido" if ok else "No se pudo retener"
+
+    def liberar_asiento(self, numero_sala, fila, columna, *, clave_idempotencia=None):
+        """
+        Libera una butaca (cancelación o retención vencida).
+        Si la butaca estaba retenida para una función, el asiento vuelve a la venta
+        y se reasigna a la lista de espera de esa función.
+        """
+        return self._idempotente(clave_idempotencia, self._liberar_asiento, numero_sala, fila, columna)
+
+    def _liberar_asiento(self, numero_sala, fila, columna):
+        sala = self._buscar_sala(numero_sala)
+        if not sala:
+            return False, "Sala no encontrada"
+        with self._mutacion():
+            if (numero_sala, fila, columna) in self._butacas_vendidas:
+                return False, "La butaca corresponde a una entrada vendida: cancele la entrada"
+            ok = sala.liberar_asiento(fila, columna)
+            funcion = self._retenciones.pop((numero_sala, fila, columna), None) if ok else None
+            if funcion is not None and funcion.soltar_retencion(1):
+                self._reasignar_lista_espera(funcion)
+        return ok, "Asiento liberado" if ok else "No se pudo liberar"
+
+    def feed_butacas(self, funcion):
+        """
+        Devuelve el flujo de cambios de butacas de la sala donde se proyecta la función.
+        Las butacas pertenecen a la sala, por lo que las funciones de una misma sala comparten feed.
+        """
+        feed = self.feeds_butacas.get(funcion.sala)
+        if feed is None:
+            sala = self._buscar_sala(funcion.sala)
+            if not sala:
+                return None
+            with self._cerrojo_escritura:
+                feed = self.feeds_butacas.get(funcion.sala)
+                if feed is None:
+                    feed = self.feeds_butacas[funcion.sala] = FeedButacas(sala)
+        return feed
+
+    def vender_entrada_general(self, funcion, asiento, dia_semana, hora_int, *, butaca_retenida=None,
+                               clave_idempotencia=None):
+        """
+        Vende una entrada general. `butaca_retenida` (fila, columna) confirma una butaca
+        que el comprador retuvo con retener_asiento(..., funcion=funcion): la venta consume
+        la retención y la butaca pasa a reservada.
+        """
+        return self._idempotente(clave_idempotencia, self._vender_entrada_general,
+                                 funcion, asiento, dia_semana, hora_int, butaca_retenida)
+
+    def _vender_entrada_general(self, funcion, asiento, dia_semana, hora_int, butaca_retenida):
+        with self._mutacion():
+            if butaca_retenida is None:
+                ok, resultado = self._emitir_entradas(funcion, [asiento], dia_semana, hora_int)
+            else:
+                ok, resultado = self._confirmar_retencion(funcion, asiento, dia_semana, hora_int,
+                                                          *butaca_retenida)
+        return (True, resultado[0]) if ok else (False, resultado)
+
+    def _confirmar_retencion(self, funcion, asiento, dia_semana, hora_int, fila, columna):
+        """
+        Vende la entrada de una butaca retenida para la función y la marca como reservada.
+        Debe llamarse dentro de _mutacion().
+        """
+        clave = (funcion.sala, fila, columna)
+        if self._retenciones.get(clave) is not funcion:
+            return False, "La butaca no está retenida para esta función"
+        ok, resultado = self._emitir_entradas(funcion, [asiento], dia_semana, hora_int, retenidos=1)
+        if ok:
+            del self._retenciones[clave]
+            self._buscar_sala(funcion.sala).reservar_asiento(fila, columna, retenido=True)
+            self._butacas_vendidas[clave] = resultado[0].numero_entrada
+        return ok, resultado
+
+    def _emitir_entradas(self, funcion, asientos, dia_semana, hora_int, retenidos=0):
+        """
+        Crea y registra entradas generales para los asientos indicados
+        (None para admisión general, sin butaca asignada).
+        Debe llamarse dentro de _mutacion(). Valida todas las entradas antes
+        de modificar el estado: o se venden todas o ninguna.
+        """
+        # Los números se asignan dentro de la mutación para que dos ventas simultáneas no los repitan
+        base = self._ultima_entrada
+        entradas = []
+        for i, asiento in enumerate(asientos, start=1):
+            entrada = EntradaGeneral(
+                numero_entrada=base + i,
+                funcion=funcion,
+                asiento=asiento,
+                precio_base=100,
+                dia_semana=dia_semana,
+                horario_funcion=hora_int,
+            )
+            if not entrada.validar_requisitos():
+                return False, "Entrada no valida"
+            entradas.append(entrada)
+        codigo = funcion.codigo
+        con_asiento = [a for a in asientos if a is not None]
+        if len(set(con_asiento)) != len(con_asiento) or any(
+                self.control_acceso.asiento_vendido(codigo, a) for a in con_asiento):
+            return False, "Asiento ya vendido para esta función"
+        # El precio se calcula antes de tocar el estado: si falla, no queda una venta a medias
+        total = sum(entrada.calcular_precio_final() for entrada in entradas)
+        # Los contadores de la función alimentan los reportes por función y la ocupación
+        if not funcion.vender_entrada(len(entradas), total, retenidos):
+            return False, "No hay suficientes asientos disponibles"
+        self._ultima_entrada += len(entradas)
+        self.entradas_vendidas.extend(entradas)
+        self.ingresos_taquilla += total
+        for entrada in entradas:
+            self.control_acceso.registrar(entrada)
+        return True, entradas
+
+    def vender_entradas_grupo(self, funcion, asientos, dia_semana, hora_int, cola_impresion=None,
+                              clave_idempotencia=None):
+        """
+        Vende una entrada general por asiento, todas o ninguna.
+        Si se indica una cola de impresión, los tickets se encolan y la venta vuelve
+        sin esperar a que se impriman.
+        Devuelve (True, {"entradas": [...], "sin_imprimir": [...]}) o (False, motivo).
+        """
+        return self._idempotente(clave_idempotencia, self._vender_entradas_grupo,
+                                 funcion, tuple(asientos), dia_semana, hora_int, cola_impresion)
+
+    def _vender_entradas_grupo(self, funcion, asientos, dia_semana, hora_int, cola_impresion):
+        with self._mutacion():
+            ok, resultado = self._emitir_entradas(funcion, asientos, dia_semana, hora_int)
+        if not ok:
+            return False, resultado
+        sin_imprimir = cola_impresion.encolar_varias(resultado) if cola_impresion is not None else []
+        return True, {"entradas": resultado, "sin_imprimir": sin_imprimir}
+
+    def validar_ingreso(self, numero_entrada, funcion_puerta=None, clave_idempotencia=None):
+        """
+        Valida una entrada en la puerta; rechaza números inexistentes y entradas ya usadas.
+        Un escáner que reintenta con la misma clave recibe la respuesta original
+        en lugar de "Entrada ya utilizada".
+        """
+        return self._idempotente(clave_idempotencia, self._validar_ingreso, numero_entrada, funcion_puerta)
+
+    def _validar_ingreso(self, numero_entrada, funcion_puerta):
+        return self.control_acceso.validar(numero_entrada, funcion_puerta=funcion_puerta)
+
+    def lista_espera(self, funcion):
+        lista = self.listas_espera.get(funcion.codigo)
+        if lista is None:
+            lista = self.listas_espera[funcion.codigo] = ListaEspera(
+                funcion, vender=lambda solicitud: self._vender_solicitud(funcion, solicitud))
+        return lista
+
+    def _vender_solicitud(self, funcion, solicitud):
+        """
+        Emite las entradas de una solicitud de la lista de espera.
+        Se invoca desde reasignar(), siempre dentro de _mutacion().
+        """
+        return self._emitir_entradas(funcion, [None] * solicitud.cantidad, solicitud.dia_semana,
+                                     horario_a_minutos(funcion.horario) // 60)
+
+    def _reasignar_lista_espera(self, funcion):
+        """
+        Ofrece los asientos libres de la función a su lista de espera.
+        Debe llamarse dentro de _mutacion().
+        """
+        lista = self.listas_espera.get(funcion.codigo)
+        return lista.reasignar() if lista else []
+
+    def vender_asientos_funcion(self, funcion, cantidad, cliente=None, nivel_fidelidad=0, *, dia_semana=None,
+                                clave_idempotencia=None):
+        """
+        Vende `cantidad` entradas generales de admisión general (sin butaca asignada).
+        Si no alcanzan y se indica un cliente, lo agrega a la lista de espera en lugar
+        de rechazarlo; sus entradas se emiten cuando se liberen asientos.
+        Devuelve (True, entradas) o (False, motivo).
+        """
+        return self._idempotente(clave_idempotencia, self._vender_asientos_funcion,
+                                 funcion, cantidad, cliente, nivel_fidelidad, dia_semana)
+
+    def _vender_asientos_funcion(self, funcion, cantidad, cliente, nivel_fidelidad, dia_semana):
+        if cantidad <= 0:
+            return False, "Cantidad inválida"
+        dia_semana = dia_semana or DIAS_SEMANA[date.today().weekday()]
+        with self._mutacion():
+            if cantidad <= funcion.asientos_libres():
+                return self._emitir_entradas(funcion, [None] * cantidad, dia_semana,
+                                             horario_a_minutos(funcion.horario) // 60)
+            if cliente is None:
+                return False, "No hay suficientes asientos disponibles"
+            ok, resultado = self.lista_espera(funcion).agregar(cliente, cantidad, nivel_fidelidad, dia_semana)
+        return False, "En lista de espera" if ok else resultado
+
+    def cancelar_asientos_funcion(self, funcion, entradas, *, clave_idempotencia=None):
+        """
+        Cancela entradas vendidas de una función (números o objetos Entrada), todas o ninguna:
+        devuelve su importe, las quita de las ventas y del control de acceso, y reasigna
+        los asientos liberados a la lista de espera. Devuelve las solicitudes asignadas.
+        """
+        numeros = tuple(e.numero_entrada if isinstance(e, Entrada) else ControlAcceso._normalizar_numero(e)
+                        for e in entradas)
+        return self._idempotente(clave_idempotencia, self._cancelar_asientos_funcion, funcion, numeros)
+
+    def _cancelar_asientos_funcion(self, funcion, numeros):
+        if not numeros or None in numeros:
+            return False, "Entrada inexistente"
+        with self._mutacion():
+            ok, resultado = self.control_acceso.anular(funcion.codigo, numeros)
+            if not ok:
+                return False, resultado
+            total = sum(entrada.calcular_precio_final() for entrada in resultado)
+            funcion.liberar_asientos(len(resultado), total)
+            self.ingresos_taquilla -= total
+            anuladas = set(numeros)
+            # Copia nueva: los lectores sin cerrojo siguen viendo la lista anterior completa
+            self.entradas_vendidas = [e for e in self.entradas_vendidas if e.numero_entrada not in anuladas]
+            # Las butacas confirmadas con esas entradas vuelven a estar libres en el mapa de la sala
+            for clave in [c for c, n in self._butacas_vendidas.items() if n in anuladas]:
+                del self._butacas_vendidas[clave]
+                self._buscar_sala(clave[0]).liberar_asiento(clave[1], clave[2])
+            asignadas = self._reasignar_lista_espera(funcion)
+        return True, asignadas
+
+    def vender_producto_confiteria(self, codigo, cantidad, clave_idempotencia=None):
+        return self._idempotente(clave_idempotencia, self._vender_producto_confiteria, codigo, cantidad)
+
+    def _vender_producto_confiteria(self, codigo, cantidad):
         prod = next((p for p in self.menu_confiteria if p.codigo == codigo), None)
         if not prod:
             return False, "Producto no encontrado"
-        if not prod.descontar_stock(cantidad):
-            return False, "No se pudo descontar stock"
-        self.ingresos_confiteria += prod.calcular_precio_venta() * cantidad
+        with self._mutacion():
+            if not prod.descontar_stock(cantidad):
+                return False, "No se pudo descontar stock"
+            self.ingresos_confiteria += prod.calcular_precio_venta() * cantidad
         return True, prod
 
     def obtener_reporte_ingresos(self):
-        return {
-            "taquilla": self.ingresos_taquilla,
-            "confiteria": self.ingresos_confiteria,
-            "total": self.ingresos_taquilla + self.ingresos_confiteria,
-        }
+        return self._leer_consistente(self._copiar_ingresos)[1]
@@ -21,6 +21,7 @@ def menu_principal():
         print("3. Ver menú confitería")
         print("4. Vender producto confitería")
         print("5. Ver reporte de ingresos")
+        print("6. Buscar funciones")
         print("0. Salir")
         opcion = input("Opción: ")
 
@@ -79,6 +80,22 @@ def menu_principal():
             print(f"Ingresos confitería:     ${rep['confiteria']:.2f}")
             print(f"TOTAL:                   ${rep['total']:.2f}")
 
+        elif opcion == "6":
+            desde = input("Desde (HH:MM, vacío = cualquiera): ").strip() or None
+            formato = input("Formato (ej. 3D, vacío = cualquiera): ").strip() or None
+            try:
+                edad = input("Edad del espectador (vacío = cualquiera): ").strip()
+                edad = int(edad) if edad else None
+                funciones = sistema.buscar_funciones(desde=desde, formato=formato, edad=edad)
+            except ValueError:
+                print("Datos de búsqueda inválidos")
+                continue
+            print("\n=== RESULTADOS ===")
+            if not funciones:
+                print("No hay funciones que cumplan los criterios")
+            for func in funciones:
+                print(f"[{func.codigo}] {func.titulo} - Sala {func.sala} - {func.horario}")
+
         elif opcion == "0":
             print("Saliendo del sistema...")
             break
@@ -0,0 +1,180 @@
+import contextlib
+import io
+import json
+import sys
+
+from src.services.sistema_cine import SistemaCine
+
+TAMANO_BUFFER = 1 << 20
+
+# Tipos esperados de cada campo, iguales para líneas de texto y JSONL
+ESQUEMAS = {
+    "vender_entrada": {"funcion": str, "asiento": str, "dia": str, "hora": int, "clave": str},
+    "vender_producto": {"codigo": str, "cantidad": int, "clave": str},
+    "stock": {"codigo": str},
+    "buscar": {"desde": str, "hasta": str, "titulo": str, "sala": int, "formato": str, "edad": int},
+}
+
+
+class ProcesadorLote:
+    """
+    Ejecuta un flujo de comandos sin interacción contra SistemaCine.
+    Acepta líneas de texto ("vender_entrada A01 F7 martes 18") o JSONL
+    ({"op": "vender_entrada", "funcion": "A01", ...}) y produce un resultado JSON por comando.
+    En JSONL las ventas aceptan "clave" como clave de idempotencia para reintentos.
+    """
+    def __init__(self, sistema=None):
+        self.sistema = sistema or SistemaCine()
+        self._productos = {p.codigo: p for p in self.sistema.listar_menu_confiteria()}
+        self._comandos = {
+            "vender_entrada": self._vender_entrada,
+            "vender_producto": self._vender_producto,
+            "stock": self._stock,
+            "reporte": self._reporte,
+            "cartelera": self._cartelera,
+            "buscar": self._buscar,
+        }
+
+    # ----------------- Parseo ---------------------------
+    @classmethod
+    def _parsear(cls, linea):
+        """
+        Convierte una línea de texto o JSON en (operación, argumentos con tipos validados).
+        """
+        op, args = cls._parsear_crudo(linea)
+        return op, cls._normalizar(op, args)
+
+    @staticmethod
+    def _normalizar(op, args):
+        """
+        Convierte los campos numéricos y rechaza tipos incorrectos antes de llegar a SistemaCine.
+        """
+        esquema = ESQUEMAS.get(op, {})
+        normalizados = {}
+        for campo, valor in args.items():
+            tipo = esquema.get(campo)
+            if tipo is int:
+                if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+                    raise ValueError(f"'{campo}' debe ser un entero")
+                valor = int(valor)
+            elif tipo is str and not isinstance(valor, str):
+                raise ValueError(f"'{campo}' debe ser texto")
+            normalizados[campo] = valor
+        return normalizados
+
+    @staticmethod
+    def _parsear_crudo(linea):
+        if linea.startswith("{"):
+            datos = json.loads(linea)
+            if not isinstance(datos, dict):
+                raise ValueError("se esperaba un objeto JSON")
+            op = datos.pop("op", "")
+            return op, datos
+        partes = linea.split()
+        op = partes[0]
+        if op == "vender_entrada":
+            funcion, asiento, dia, hora = partes[1:5]
+            return op, {"funcion": funcion, "asiento": asiento, "dia": dia, "hora": hora}
+        if op == "vender_producto":
+            codigo, cantidad = partes[1:3]
+            return op, {"codigo": codigo, "cantidad": cantidad}
+        if op == "stock":
+            return op, {"codigo": partes[1]} if len(partes) > 1 else {}
+        if op == "buscar":
+            # buscar desde=19:00 formato=3D edad=14
+            return op, dict(p.split("=", 1) for p in partes[1:])
+        return op, {}
+
+    # ----------------- Comandos -------------------------
+    def _vender_entrada(self, funcion, asiento, dia, hora, clave=None):
+        func = self.sistema.buscar_funcion(funcion)
+        if not func:
+            return {"ok": False, "error": "Funcion no encontrada"}
+        ok, resultado = self.sistema.vender_entrada_general(func, asiento, dia, hora,
+                                                            clave_idempotencia=clave)
+        if not ok:
+            return {"ok": False, "error": resultado}
+        return {"ok": True, "tipo": resultado.__class__.__name__,
+                "total": round(resultado.calcular_precio_final(), 2)}
+
+    def _vender_producto(self, codigo, cantidad, clave=None):
+        ok, resultado = self.sistema.vender_producto_confiteria(codigo, cantidad, clave_idempotencia=clave)
+        if not ok:
+            return {"ok": False, "error": resultado}
+        return {"ok": True, "producto": resultado.nombre, "cantidad": cantidad, "stock": resultado.stock}
+
+    def _stock(self, codigo=None):
+        if codigo is None:
+            return {"ok": True, "stock": {c: p.stock for c, p in self._productos.items()}}
+        prod = self._productos.get(codigo)
+        if not prod:
+            return {"ok": False, "error": "Producto no encontrado"}
+        return {"ok": True, "stock": {codigo: prod.stock}}
+
+    def _reporte(self):
+        return {"ok": True, **self.sistema.obtener_reporte_ingresos()}
+
+    @staticmethod
+    def _resumen_funciones(funciones):
+        return [{"codigo": f.codigo, "titulo": f.titulo, "sala": f.sala, "horario": f.horario} for f in funciones]
+
+    def _cartelera(self):
+        return {"ok": True, "cartelera": self._resumen_funciones(self.sistema.listar_cartelera())}
+
+    def _buscar(self, **criterios):
+        return {"ok": True, "cartelera": self._resumen_funciones(self.sistema.buscar_funciones(**criterios))}
+
+    # ----------------- Ejecución ------------------------
+    def ejecutar_linea(self, linea):
+        """
+        Ejecuta un comando y devuelve su resultado como diccionario.
+        Los errores de formato se reportan en el resultado sin detener el flujo.
+        """
+        try:
+            op, args = self._parsear(linea)
+            comando = self._comandos.get(op)
+            if comando is None:
+                return {"ok": False, "error": f"Comando desconocido: {op}"}
+            return comando(**args)
+        except (ValueError, TypeError) as error:
+            return {"ok": False, "error": f"Comando inválido: {error}"}
+        except Exception as error:
+            # Un comando que falla no debe cortar el resto del lote
+            return {"ok": False, "error": f"Error al ejecutar el comando: {error!r}"}
+
+    def procesar(self, entrada, salida):
+        """
+        Procesa todas las líneas de `entrada` (texto) y escribe un JSON por línea en
+        `salida` (binario, con buffer). Los avisos que imprimen los modelos se desvían
+        a stderr para no mezclarse con los resultados.
+        Devuelve la cantidad de comandos procesados.
+        """
+        procesados = 0
+        dumps = json.dumps
+        escribir = salida.write
+        with contextlib.redirect_stdout(sys.stderr):
+            for numero, linea in enumerate(entrada, start=1):
+                linea = linea.strip()
+                if not linea or linea.startswith("#"):
+                    continue
+                resultado = self.ejecutar_linea(linea)
+                resultado["linea"] = numero
+                escribir(dumps(resultado, ensure_ascii=False).encode("utf-8"))
+                escribir(b"\n")
+                procesados += 1
+        salida.flush()
+        return procesados
+
+
+def ejecutar_modo_lote(ruta=None, sistema=None):
+    """
+    Punto de entrada del modo sin interfaz: lee comandos de un archivo o de stdin
+    y escribe los resultados en stdout mediante un writer con buffer grande.
+    """
+    salida = io.BufferedWriter(io.FileIO(sys.stdout.fileno(), "w", closefd=False), TAMANO_BUFFER)
+    procesador = ProcesadorLote(sistema)
+    if ruta and ruta != "-":
+        with open(ruta, encoding="utf-8", buffering=TAMANO_BUFFER) as entrada:
+            return procesador.procesar(entrada, salida)
+    entrada = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    return procesador.procesar(entrada, salida)
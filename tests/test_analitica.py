@@ -0,0 +1,100 @@
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from src.services import analitica
+from src.services.analitica import AnaliticaVentas
+from src.services.sistema_cine import SistemaCine
+
+FUNCIONES = {"F1": ("Dune", 1, 18), "F2": ("Dune", 2, 20), "F3": ("Cosmos", 1, 12)}
+CAPACIDAD = {"F1": 100, "F2": 80, "F3": 50}
+
+
+def _filas(cantidad, semilla=7):
+    rnd = np.random.default_rng(semilla)
+    codigos = rnd.choice(list(FUNCIONES), cantidad)
+    return {
+        "funcion": codigos,
+        "titulo": np.array([FUNCIONES[c][0] for c in codigos]),
+        "sala": np.array([FUNCIONES[c][1] for c in codigos]),
+        "hora": np.array([FUNCIONES[c][2] for c in codigos]),
+        "dia": rnd.choice(["lunes", "Martes", "sabado"], cantidad),
+        "tipo": rnd.choice(["EntradaGeneral", "EntradaInfantil"], cantidad),
+        "importe": rnd.uniform(50, 150, cantidad),
+        "capacidad": np.array([CAPACIDAD[c] for c in codigos]),
+    }
+
+
+def _cargar(filas):
+    analitica_ventas = AnaliticaVentas()
+    analitica_ventas.cargar_columnas(**filas)
+    return analitica_ventas
+
+
+def _esperado(filas, por, medida, dia=None):
+    conteo, ingresos, sesiones = defaultdict(int), defaultdict(float), defaultdict(dict)
+    for i in range(len(filas["importe"])):
+        fila = {n: filas[n][i].item() for n in filas}
+        fila["dia"] = fila["dia"].lower()
+        if dia is not None and fila["dia"] != dia:
+            continue
+        celda = tuple(fila[n] for n in por)
+        conteo[celda] += 1
+        ingresos[celda] += fila["importe"]
+        sesiones[celda][(fila["funcion"], fila["dia"])] = fila["capacidad"]
+    if medida == "entradas":
+        return dict(conteo)
+    if medida == "ingresos":
+        return dict(ingresos)
+    return {c: conteo[c] * 100.0 / sum(sesiones[c].values()) for c in conteo}
+
+
+@pytest.mark.parametrize("por", [("titulo",), ("sala", "dia"), ("funcion", "dia", "tipo")])
+@pytest.mark.parametrize("medida", ["entradas", "ingresos", "ocupacion"])
+def test_agrupar_coincide_con_el_calculo_fila_por_fila(por, medida):
+    filas = _filas(2000)
+    resultado = _cargar(filas).agrupar(por, medida)
+    assert resultado == pytest.approx(_esperado(filas, por, medida))
+
+
+def test_agrupar_sin_tabla_densa_usa_solo_las_claves_presentes(monkeypatch):
+    monkeypatch.setattr(analitica, "LIMITE_TABLA_DENSA", 1)
+    filas = _filas(2000)
+    por = ("funcion", "titulo", "sala", "dia", "hora", "tipo")
+    resultado = _cargar(filas).agrupar(por, "ocupacion")
+    assert resultado == pytest.approx(_esperado(filas, por, "ocupacion"))
+
+
+def test_filtros_y_cargas_incrementales():
+    filas = _filas(1000)
+    primera = {n: v[:600] for n, v in filas.items()}
+    segunda = {n: v[600:] for n, v in filas.items()}
+    analitica_ventas = _cargar(primera)
+    analitica_ventas.agrupar(("titulo",), "ingresos")
+    analitica_ventas.cargar_columnas(**segunda)
+    assert analitica_ventas.filas == 1000
+    assert analitica_ventas.agrupar(("titulo",), "ocupacion", {"dia": "martes"}) == \
+        pytest.approx(_esperado(filas, ("titulo",), "ocupacion", dia="martes"))
+
+
+def test_top_k_mezcla_y_adjuncion_desde_el_sistema():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    sistema.vender_entradas_grupo(funcion, ["F1", "F2", "F3"], "martes", 18)
+    sistema.vender_entrada_general(sistema.buscar_funcion("C01"), "A1", "lunes", 10)
+    analitica_ventas = AnaliticaVentas()
+    analitica_ventas.cargar_desde_sistema(sistema)
+    analitica_ventas.registrar_confiteria("A01", 2, 20000)
+
+    assert analitica_ventas.top_k(1, ("titulo",), "entradas") == [(("Avengers",), 3.0)]
+    assert analitica_ventas.mezcla_tipos() == {"EntradaGeneral": 1.0}
+    assert analitica_ventas.tasa_adjuncion_confiteria() == pytest.approx({"A01": 2 / 3, "C01": 0.0})
+    assert analitica_ventas.agrupar(("titulo",), "ocupacion")[("Avengers",)] == pytest.approx(3.0)
+
+
+def test_sin_ventas_no_hay_resultados():
+    analitica_ventas = AnaliticaVentas()
+    assert analitica_ventas.agrupar(("titulo",), "ocupacion") == {}
+    assert analitica_ventas.top_k(3) == []
+    assert analitica_ventas.tasa_adjuncion_confiteria() == {}
@@ -0,0 +1,92 @@
+import threading
+
+from src.services.cache_idempotencia import CacheIdempotencia
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_reintento_devuelve_el_resultado_original():
+    cache = CacheIdempotencia()
+    llamadas = []
+
+    def operacion(x):
+        llamadas.append(x)
+        return True, len(llamadas)
+
+    assert cache.ejecutar("k", operacion, 1) == (True, 1)
+    assert cache.ejecutar("k", operacion, 1) == (True, 1)
+    assert llamadas == [1]
+
+
+def test_clave_reutilizada_con_otros_argumentos_se_rechaza():
+    cache = CacheIdempotencia()
+    cache.ejecutar("k", lambda x: (True, x), 1)
+    assert cache.ejecutar("k", lambda x: (True, x), 2) == \
+        (False, "Clave de idempotencia reutilizada con otros datos")
+
+
+def test_desalojo_lru_por_capacidad():
+    cache = CacheIdempotencia(capacidad=2)
+    llamadas = []
+
+    def operacion(x):
+        llamadas.append(x)
+        return x
+
+    cache.ejecutar("a", operacion, "a")
+    cache.ejecutar("b", operacion, "b")
+    cache.ejecutar("a", operacion, "a")      # "a" pasa a ser la más reciente
+    cache.ejecutar("c", operacion, "c")      # desaloja "b"
+    assert len(cache) == 2
+    cache.ejecutar("a", operacion, "a")
+    cache.ejecutar("b", operacion, "b")
+    assert llamadas == ["a", "b", "c", "b"]
+
+
+def test_las_entradas_vencen_por_ttl():
+    reloj = RelojFalso()
+    cache = CacheIdempotencia(ttl_segundos=10, reloj=reloj)
+    llamadas = []
+
+    def operacion():
+        llamadas.append(reloj.ahora)
+        return len(llamadas)
+
+    assert cache.ejecutar("k", operacion) == 1
+    reloj.ahora = 9.9
+    assert cache.ejecutar("k", operacion) == 1
+    reloj.ahora = 10.0
+    assert cache.ejecutar("k", operacion) == 2
+
+
+def test_reintentos_concurrentes_ejecutan_una_sola_vez():
+    cache = CacheIdempotencia()
+    empezo = threading.Event()
+    seguir = threading.Event()
+    llamadas = []
+
+    def operacion():
+        llamadas.append(1)
+        empezo.set()
+        seguir.wait(5)
+        return "hecho"
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.ejecutar("k", operacion))) for _ in range(4)]
+    hilos[0].start()
+    empezo.wait(5)
+    for hilo in hilos[1:]:
+        hilo.start()
+    # Otra clave no espera a la operación en curso
+    assert cache.ejecutar("otra", lambda: "libre") == "libre"
+    seguir.set()
+    for hilo in hilos:
+        hilo.join(5)
+    assert resultados == ["hecho"] * 4
+    assert llamadas == [1]
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from src.services.cola_impresion import ColaImpresion
+from src.services.sistema_cine import SistemaCine
+
+
+class EntradaRota:
+    def renderizar_ticket(self, plantilla):
+        raise RuntimeError("sin tinta")
+
+
+def _entradas(cantidad):
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    ok, resultado = sistema.vender_entradas_grupo(funcion, [f"F{i}" for i in range(1, cantidad + 1)], "lunes", 18)
+    assert ok
+    return resultado["entradas"]
+
+
+def test_plantilla_invalida_se_rechaza_al_crear_la_cola():
+    with pytest.raises(ValueError):
+        ColaImpresion(io.StringIO(), plantilla="{numero} {inexistente}")
+
+
+def test_imprime_todas_las_entradas_encoladas():
+    destino = io.StringIO()
+    with ColaImpresion(destino, tamano_lote=2) as cola:
+        assert cola.encolar_varias(_entradas(3)) == []
+        cola.esperar()
+        assert cola.impresos == 3
+    assert destino.getvalue().count("==== TICKET CINE ====") == 3
+
+
+def test_un_lote_fallido_no_detiene_al_trabajador(capsys):
+    destino = io.StringIO()
+    with ColaImpresion(destino, tamano_lote=1) as cola:
+        assert cola.encolar(EntradaRota())
+        cola.esperar()
+        assert cola.errores == 1
+        assert cola.encolar_varias(_entradas(1)) == []
+        cola.esperar()
+        assert cola.impresos == 1
+    assert "Error de impresión" in capsys.readouterr().out
+
+
+def test_encolar_con_trabajador_detenido_devuelve_las_entradas():
+    cola = ColaImpresion(io.StringIO())
+    cola.cerrar()
+    entradas = _entradas(2)
+    assert cola.encolar_varias(entradas) == entradas
+
+
+def test_venta_grupal_es_todo_o_nada():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    sistema.vender_entrada_general(funcion, "F8", "lunes", 18)
+
+    ok, _ = sistema.vender_entradas_grupo(funcion, ["F6", "F7", "F8"], "lunes", 18)
+    assert not ok
+    assert len(sistema.entradas_vendidas) == 1
+    assert funcion._asientos_vendidos == 1
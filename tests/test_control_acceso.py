@@ -0,0 +1,34 @@
+from src.services.sistema_cine import SistemaCine
+
+
+def test_venta_rechaza_asiento_ya_vendido():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    assert sistema.vender_entrada_general(funcion, "F7", "lunes", 18)[0]
+
+    ok, motivo = sistema.vender_entrada_general(funcion, "F7", "lunes", 18)
+    assert not ok
+    assert motivo == "Asiento ya vendido para esta función"
+    assert len(sistema.entradas_vendidas) == 1
+
+
+def test_validar_ingreso_detecta_escaneo_duplicado():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    _, entrada = sistema.vender_entrada_general(funcion, "F7", "lunes", 18)
+
+    assert sistema.validar_ingreso(entrada.numero_entrada) == (True, entrada)
+    assert sistema.validar_ingreso(entrada.numero_entrada) == (False, "Entrada ya utilizada")
+    # Los lectores de código de barras envían el número como texto
+    assert sistema.validar_ingreso(f"{entrada.numero_entrada:06d}") == (False, "Entrada ya utilizada")
+
+
+def test_validar_ingreso_con_clave_es_seguro_ante_reintentos():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    _, entrada = sistema.vender_entrada_general(funcion, "F7", "lunes", 18)
+
+    primero = sistema.validar_ingreso(entrada.numero_entrada, clave_idempotencia="escaner-1")
+    reintento = sistema.validar_ingreso(entrada.numero_entrada, clave_idempotencia="escaner-1")
+    assert primero == reintento == (True, entrada)
+    assert sistema.control_acceso.escaneadas("A01") == 1
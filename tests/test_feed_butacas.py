@@ -0,0 +1,56 @@
+import threading
+
+from src.models.salas import Sala2D
+from src.services.feed_butacas import FeedButacas
+from src.services.sistema_cine import SistemaCine
+
+
+def _hilos_feed():
+    return sum(1 for h in threading.enumerate() if h.name == "feed-butacas")
+
+
+def test_cambios_desde_devuelve_deltas_o_foto_si_quedo_atras():
+    sala = Sala2D(1, 16)
+    feed = FeedButacas(sala, capacidad_buffer=4)
+    sala.reservar_asiento(0, 0)
+    sala.retener_asiento(0, 1)
+    assert feed.cambios_desde(0) == {"version": 2, "cambios": [(1, 0, 0, 1), (2, 0, 1, 2)]}
+    assert feed.cambios_desde(1) == {"version": 2, "cambios": [(2, 0, 1, 2)]}
+
+    for columna in range(2, 4):
+        sala.reservar_asiento(0, columna)
+        sala.reservar_asiento(1, columna)
+    foto = feed.cambios_desde(0)
+    assert foto["version"] == 6
+    assert foto["butacas"][0] == (1, 2, 1, 1)
+
+
+def test_un_suscriptor_que_falla_no_afecta_la_venta_ni_a_los_demas():
+    sistema = SistemaCine()
+    feed = sistema.feed_butacas(sistema.buscar_funcion("A01"))
+    recibidos = []
+
+    def roto(delta):
+        raise RuntimeError("desconectado")
+
+    feed.suscribir(roto)
+    feed.suscribir(recibidos.append)
+    assert sistema.reservar_asientos(1, 0, 0)[0]
+    assert sistema.reservar_asientos(1, 0, 1)[0]
+    feed.esperar()
+    assert recibidos == [(1, 0, 0, 1), (2, 0, 1, 1)]
+    assert feed.errores == 2
+    feed.cerrar()
+
+
+def test_cerrar_detiene_el_despachador():
+    sistema = SistemaCine()
+    antes = _hilos_feed()
+    for _ in range(3):
+        funcion = sistema.buscar_funcion("D01") or sistema.buscar_funcion("D02")
+        sistema.feed_butacas(funcion).suscribir(lambda delta: None)
+        assert _hilos_feed() == antes + 1
+        sistema.retirar_funcion("D01")
+        sistema.retirar_funcion("D02")
+        assert _hilos_feed() == antes
+        sistema.agregar_funcion(funcion)
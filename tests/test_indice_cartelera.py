@@ -0,0 +1,61 @@
+from src.models.funciones import FuncionEstreno
+from src.services.indice_cartelera import IndiceCartelera
+from src.services.sistema_cine import SistemaCine
+from src.ui.modo_lote import ProcesadorLote
+
+
+def _codigos(funciones):
+    return [f.codigo for f in funciones]
+
+
+def test_consultas_combinan_horario_y_atributos():
+    sistema = SistemaCine()
+    assert _codigos(sistema.buscar_funciones(desde="18:00", hasta="20:00")) == ["A01", "D02", "A02"]
+    assert _codigos(sistema.buscar_funciones(sala=1)) == ["A01", "A02"]
+    assert _codigos(sistema.buscar_funciones(titulo="dune 2")) == ["A02"]
+    assert _codigos(sistema.buscar_funciones(desde="21:00", sala=1)) == []
+
+
+def test_formato_no_distingue_mayusculas():
+    sistema = SistemaCine()
+    assert _codigos(sistema.buscar_funciones(formato="3d")) == ["A02"]
+    assert _codigos(sistema.buscar_funciones(formato="3D")) == ["A02"]
+
+
+def test_el_cache_se_invalida_al_cambiar_la_cartelera():
+    indice = IndiceCartelera(SistemaCine().listar_cartelera())
+    assert _codigos(indice.consultar(formato="4k")) == ["A01"]
+    # El resultado en cache no se comparte: modificar la lista devuelta no lo altera
+    indice.consultar(formato="4k").clear()
+    assert _codigos(indice.consultar(formato="4k")) == ["A01"]
+
+    nueva = FuncionEstreno("A03", "Matrix", 136, "23:00", 2, 69, "Ingles", "4K")
+    indice.agregar(nueva)
+    assert _codigos(indice.consultar(formato="4k")) == ["A01", "A03"]
+    indice.retirar("A01")
+    assert _codigos(indice.consultar(formato="4k")) == ["A03"]
+    assert indice.obtener("A01") is None
+
+
+def test_buscar_en_lote_normaliza_sala_y_edad():
+    procesador = ProcesadorLote()
+    por_json = procesador.ejecutar_linea('{"op": "buscar", "sala": "1", "formato": "3d"}')
+    por_texto = procesador.ejecutar_linea("buscar sala=1 formato=3d")
+    assert por_json == por_texto
+    assert [f["codigo"] for f in por_json["cartelera"]] == ["A02"]
+    assert not procesador.ejecutar_linea('{"op": "buscar", "edad": "catorce"}')["ok"]
+
+
+def test_retirar_funcion_limpia_lista_de_espera_y_control_de_acceso():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("D01")
+    _, entradas = sistema.vender_asientos_funcion(funcion, 100, dia_semana="lunes")
+    sistema.vender_asientos_funcion(funcion, 2, cliente="ana", dia_semana="lunes")
+    sistema.feed_butacas(funcion)
+
+    assert sistema.retirar_funcion("D01") is funcion
+    assert "D01" not in sistema.listas_espera
+    assert sistema.validar_ingreso(entradas[0].numero_entrada) == (False, "Entrada inexistente")
+    # La sala 4 sigue en uso por D02: su feed se conserva
+    assert 4 in sistema.feeds_butacas
+    assert sistema.buscar_funciones(sala=4) == [sistema.buscar_funcion("D02")]
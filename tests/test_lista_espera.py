@@ -0,0 +1,83 @@
+import pytest
+
+from src.services.sistema_cine import SistemaCine
+
+
+def _funcion_llena(sistema, codigo="C01"):
+    funcion = sistema.buscar_funcion(codigo)
+    ok, entradas = sistema.vender_asientos_funcion(funcion, 100, dia_semana="lunes")
+    assert ok
+    return funcion, entradas
+
+
+def test_liberar_retencion_reasigna_a_la_lista_de_espera():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("C01")
+    assert sistema.vender_asientos_funcion(funcion, 98, dia_semana="lunes")[0]
+    assert sistema.retener_asiento(3, 0, 0, funcion=funcion)[0]
+    assert sistema.vender_asientos_funcion(funcion, 2, cliente="ana", dia_semana="lunes") == \
+        (False, "En lista de espera")
+
+    assert sistema.liberar_asiento(3, 0, 0)[0]
+    assert len(sistema.lista_espera(funcion)) == 0
+    assert len(sistema.entradas_vendidas) == 100
+    assert funcion.asientos_libres() == 0
+
+
+def test_cancelar_entradas_devuelve_importe_y_reasigna():
+    sistema = SistemaCine()
+    funcion, entradas = _funcion_llena(sistema)
+    assert sistema.vender_asientos_funcion(funcion, 2, cliente="ana", dia_semana="lunes") == \
+        (False, "En lista de espera")
+
+    ok, asignadas = sistema.cancelar_asientos_funcion(funcion, [entradas[0], str(entradas[1].numero_entrada)])
+    assert ok
+    assert [s.cliente for s in asignadas] == ["ana"]
+    assert len(asignadas[0].entradas) == 2
+    assert len(sistema.entradas_vendidas) == 100
+    assert len({e.numero_entrada for e in sistema.entradas_vendidas}) == 100
+    assert sistema.ingresos_taquilla == funcion.get_recaudacion()
+    assert sistema.validar_ingreso(entradas[0].numero_entrada) == (False, "Entrada inexistente")
+    assert sistema.validar_ingreso(asignadas[0].entradas[0].numero_entrada)[0]
+
+
+def test_cancelar_es_todo_o_nada_y_rechaza_entradas_utilizadas():
+    sistema = SistemaCine()
+    funcion, entradas = _funcion_llena(sistema)
+    assert sistema.validar_ingreso(entradas[1].numero_entrada)[0]
+
+    assert sistema.cancelar_asientos_funcion(funcion, entradas[:2]) == (False, "Entrada ya utilizada")
+    assert len(sistema.entradas_vendidas) == 100
+    assert sistema.validar_ingreso(entradas[0].numero_entrada)[0]
+    assert sistema.cancelar_asientos_funcion(sistema.buscar_funcion("C02"), entradas[2:3]) == \
+        (False, "Entrada inexistente")
+
+
+def test_venta_de_butaca_retenida_la_confirma_en_la_sala():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    feed = sistema.feed_butacas(funcion)
+    assert sistema.retener_asiento(1, 0, 0, funcion=funcion)[0]
+
+    ok, entrada = sistema.vender_entrada_general(funcion, "A1", "lunes", 18, butaca_retenida=(0, 0))
+    assert ok
+    assert funcion._asientos_retenidos == 0
+    assert feed.cambios_desde(0)["cambios"][-1][1:] == (0, 0, 1)
+    # Una butaca vendida solo se libera cancelando su entrada
+    assert not sistema.liberar_asiento(1, 0, 0)[0]
+    assert sistema.cancelar_asientos_funcion(funcion, [entrada])[0]
+    assert sistema.salas[0].estado_asiento(0, 0) == 0
+
+
+def test_venta_con_butaca_no_retenida_se_rechaza():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    assert sistema.vender_entrada_general(funcion, "A1", "lunes", 18, butaca_retenida=(0, 0)) == \
+        (False, "La butaca no está retenida para esta función")
+
+
+def test_parametros_nuevos_son_solo_por_nombre():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    with pytest.raises(TypeError):
+        sistema.vender_entrada_general(funcion, "A1", "lunes", 18, "clave")
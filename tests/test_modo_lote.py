@@ -0,0 +1,52 @@
+import io
+import json
+
+from src.ui.modo_lote import ProcesadorLote
+
+
+def test_venta_con_clave_se_reintenta_sin_duplicar():
+    procesador = ProcesadorLote()
+    linea = json.dumps({"op": "vender_entrada", "funcion": "A01", "asiento": "F7",
+                        "dia": "lunes", "hora": 18, "clave": "k1"})
+
+    primero = procesador.ejecutar_linea(linea)
+    assert primero["ok"]
+    assert procesador.ejecutar_linea(linea) == primero
+    assert len(procesador.sistema.entradas_vendidas) == 1
+
+
+def test_tipos_incorrectos_se_rechazan_sin_vender():
+    procesador = ProcesadorLote()
+    resultado = procesador.ejecutar_linea(json.dumps({"op": "vender_entrada", "funcion": "A01",
+                                                      "asiento": 7, "dia": "lunes", "hora": 18}))
+    assert resultado == {"ok": False, "error": "Comando inválido: 'asiento' debe ser texto"}
+    assert not procesador.ejecutar_linea('{"op": "vender_producto", "codigo": "P01", "cantidad": true}')["ok"]
+    assert procesador.sistema.entradas_vendidas == []
+    assert procesador.sistema.ingresos_confiteria == 0
+
+
+def test_texto_y_json_normalizan_igual():
+    procesador = ProcesadorLote()
+    texto = procesador.ejecutar_linea("vender_producto P01 2")
+    json_ = procesador.ejecutar_linea('{"op": "vender_producto", "codigo": "P01", "cantidad": "2"}')
+    assert texto["ok"] and json_["ok"]
+    assert texto["stock"] - json_["stock"] == 2
+
+
+def test_una_linea_que_falla_no_corta_el_lote():
+    procesador = ProcesadorLote()
+    entrada = io.StringIO(
+        "# comentario\n"
+        "vender_entrada A01 F7 martes 18\n"
+        "{no es json\n"
+        "\n"
+        '{"op": "vender_entrada", "funcion": "A01", "asiento": "F8", "dia": "martes"}\n'
+        "desconocido\n"
+        "reporte\n"
+    )
+    salida = io.BytesIO()
+    assert procesador.procesar(entrada, salida) == 5
+    resultados = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert [r["linea"] for r in resultados] == [2, 3, 5, 6, 7]
+    assert [r["ok"] for r in resultados] == [True, False, False, False, True]
+    assert resultados[4]["taquilla"] == resultados[0]["total"]
@@ -0,0 +1,58 @@
+from src.services.sala_espera_virtual import SalaEsperaVirtual
+from src.services.sistema_cine import SistemaCine
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def _sala(reloj):
+    sistema = SistemaCine()
+    return SalaEsperaVirtual(sistema, sistema.buscar_funcion("C01"), tasa_admision=1, rafaga=1, reloj=reloj)
+
+
+def _posicion(sala, cliente):
+    return sala.consultar(cliente)["posicion"]
+
+
+def test_los_abandonos_no_cuentan_para_la_posicion():
+    sala = _sala(RelojFalso())
+    for cliente in "abcde":
+        sala.entrar(cliente)
+    for cliente in "bcd":
+        assert sala.abandonar(cliente)
+    assert sala.consultar("a")["estado"] == "admitido"
+    assert _posicion(sala, "e") == 1
+
+
+def test_volver_a_entrar_va_al_final_de_la_cola():
+    reloj = RelojFalso()
+    sala = _sala(reloj)
+    for cliente in "abcde":
+        sala.entrar(cliente)
+    sala.abandonar("c")
+    ok, estado = sala.entrar("c")
+    assert ok
+    assert estado["posicion"] == 4
+    assert [_posicion(sala, c) for c in "bde"] == [1, 2, 3]
+
+    admitidos = []
+    for _ in range(4):
+        reloj.ahora += 1
+        admitidos += [c for c in "bcde" if c not in admitidos and sala.consultar(c)["estado"] == "admitido"]
+    assert admitidos == ["b", "d", "e", "c"]
+
+
+def test_compra_toma_la_ventana_y_la_devuelve_si_falla():
+    sala = _sala(RelojFalso())
+    sala.entrar("a")
+    assert sala.comprar("a", 500) == (False, "No hay suficientes asientos disponibles")
+    assert sala.consultar("a")["estado"] == "admitido"
+    ok, entradas = sala.comprar("a", 2)
+    assert ok and len(entradas) == 2
+    assert sala.consultar("a")["estado"] == "fuera"
+    assert sala.comprar("a", 2) == (False, "El cliente no tiene una ventana de compra vigente")
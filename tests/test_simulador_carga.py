@@ -0,0 +1,37 @@
+from src.services.simulador_carga import generar_operaciones, simular
+
+
+def test_la_misma_semilla_genera_las_mismas_noches():
+    escenario = {"semilla": 3, "operaciones": 500}
+    assert generar_operaciones(escenario) == generar_operaciones(escenario)
+    assert generar_operaciones(escenario) != generar_operaciones({**escenario, "semilla": 4})
+
+
+def test_cada_noche_respeta_la_capacidad_y_no_repite_asientos():
+    for noche in generar_operaciones({"operaciones": 1000}):
+        asientos = {}
+        for op in noche:
+            if op[0] == "entrada":
+                asientos.setdefault(op[1], []).extend(op[2])
+        for vendidos in asientos.values():
+            assert len(vendidos) == len(set(vendidos)) <= 100
+
+
+def test_demanda_dentro_de_la_capacidad_no_tiene_rechazos():
+    reporte = simular({"operaciones": 1000})
+    assert reporte["operaciones"] >= 1000
+    assert set(reporte["tasa_rechazo"].values()) == {0.0}
+    assert reporte["latencia_ms"]["aceptadas"]["cantidad"] == reporte["operaciones"]
+    assert reporte["latencia_ms"]["rechazadas"]["cantidad"] == 0
+
+
+def test_sobreventa_reporta_rechazos_por_separado():
+    reporte = simular({"operaciones": 1000, "demanda": 2.0})
+    rechazadas = reporte["latencia_ms"]["rechazadas"]["cantidad"]
+    assert rechazadas > 0
+    assert reporte["latencia_ms"]["aceptadas"]["cantidad"] + rechazadas == reporte["operaciones"]
+
+
+def test_el_pool_de_procesos_ejecuta_las_mismas_operaciones():
+    escenario = {"operaciones": 600}
+    assert simular(escenario, procesos=2)["operaciones"] == simular(escenario)["operaciones"]
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from src.services.sistema_cine import SistemaCine
+
+
+def test_leer_consistente_reintenta_si_la_version_cambia():
+    sistema = SistemaCine()
+    llamadas = []
+
+    def lector():
+        llamadas.append(sistema._version)
+        if len(llamadas) == 1:
+            # Simula una venta completa durante la primera lectura
+            sistema._version += 2
+        return len(llamadas)
+
+    version, resultado = sistema._leer_consistente(lector)
+    assert resultado == 2
+    assert version == 2
+    assert llamadas == [0, 2]
+
+
+def test_leer_consistente_espera_mientras_la_version_es_impar():
+    sistema = SistemaCine()
+    sistema._version = 1
+
+    def terminar_venta():
+        time.sleep(0.05)
+        sistema._version = 2
+
+    hilo = threading.Thread(target=terminar_venta)
+    hilo.start()
+    version, resultado = sistema._leer_consistente(lambda: "leido")
+    hilo.join()
+    assert (version, resultado) == (2, "leido")
+
+
+def test_foto_refleja_ventas_de_entradas_por_funcion():
+    sistema = SistemaCine()
+    funcion = sistema.buscar_funcion("A01")
+    ok, entrada = sistema.vender_entrada_general(funcion, "F7", "lunes", 18)
+    assert ok
+
+    foto = sistema.tomar_foto()
+    datos = foto["funciones"]["A01"]
+    assert foto["version"] % 2 == 0
+    assert foto["total_entradas"] == 1
+    assert datos["vendidos"] == 1
+    assert datos["recaudacion"] == entrada.calcular_precio_final()
+    assert foto["ingresos"]["taquilla"] == entrada.calcular_precio_final()